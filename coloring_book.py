@@ -8,11 +8,14 @@ Usage:
 """
 
 import argparse
+import asyncio
+import itertools
 import json
+import re
 import sys
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 try:
     from dotenv import load_dotenv
@@ -21,39 +24,173 @@ except ImportError:
     pass
 
 from kdp.backends import create_llm_backend
+from kdp.jsonio import dumps
 
 
-@dataclass
+# Maximum number of in-flight per-page prompt requests
+PROMPT_CONCURRENCY = 10
+
+# Text-reply backends: re-prompt once when no JSON could be parsed
+JSON_ATTEMPTS = 2
+JSON_RETRY_NOTE = "\n\nPrevious output was not valid JSON. Return ONLY a single JSON object, no prose."
+
+# Greedy outermost-braces match, last-resort fallback in _parse_json
+_JSON_RE = re.compile(r'\{[\s\S]*\}')
+
+
+# One manuscript.md block per page (blank lines match the original layout)
+_PAGE_BLOCK = "\n\n## Page {num}: {title}\n\nType: {type}\n\n{desc}\n"
+
+# Static instructions shared by every request. Kept as the system prompt so
+# backends with prompt caching (Claude) can reuse the prefix across calls.
+SYSTEM_RULES = """You are a coloring book designer creating adult coloring books.
+
+Page idea requirements:
+- Each page should be unique and interesting
+- Include variety: scenes, patterns, objects, inspirational quotes
+- Consider the target audience (nurses/healthcare workers)
+- Mix detailed illustrations with simpler designs for variety
+
+Image prompt requirements (one per page):
+- Style: Black and white line art for coloring
+- Specifies "black and white line art, coloring book page"
+- Has clean outlines suitable for coloring
+- NO shading, NO gradients, NO filled areas
+- White background
+- Clear, distinct lines
+- Appropriate complexity for adults
+
+Always answer with a single JSON object in the requested format."""
+
+
+# JSON schemas for backends with structured output (Claude tool_use)
+_PAGE_IDEA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "page": {"type": "integer"},
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "type": {"type": "string", "enum": ["scene", "pattern", "quote", "mandala"]},
+    },
+    "required": ["page", "title", "description", "type"],
+}
+
+PAGE_PROMPT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "page": {"type": "integer"},
+        "prompt": {"type": "string"},
+    },
+    "required": ["page", "prompt"],
+}
+
+COVER_PROMPT_SCHEMA = {
+    "type": "object",
+    "properties": {"cover_prompt": {"type": "string"}},
+    "required": ["cover_prompt"],
+}
+
+PAGE_IDEAS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "pages": {"type": "array", "items": _PAGE_IDEA_SCHEMA},
+    },
+    "required": ["title", "pages"],
+}
+
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **PAGE_IDEAS_SCHEMA["properties"],
+        **COVER_PROMPT_SCHEMA["properties"],
+        "prompts": {"type": "array", "items": PAGE_PROMPT_SCHEMA},
+    },
+    "required": ["title", "pages", "cover_prompt", "prompts"],
+}
+
+
+@dataclass(frozen=True, slots=True)
 class ColoringBookConfig:
-    """Coloring book configuration"""
+    """Coloring book configuration (immutable and hashable, usable as a cache key)"""
     theme: str
     pages: int = 30
     style: str = "line art"
     difficulty: str = "medium"  # simple, medium, detailed
 
 
+class _JSONScanner:
+    """Incremental brace/string scanner.
+    
+    Feed text chunks (e.g. streamed LLM deltas); every object that closes at
+    the target nesting depth is yielded as soon as its closing brace arrives.
+    Depth 1 is a top-level object, depth 2 an object inside it (e.g. an
+    element of a "pages" array).
+    """
+    
+    def __init__(self, depth: int = 1):
+        self.target = depth
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self._buf: Optional[list[str]] = None
+    
+    def feed(self, text: str) -> Iterator[str]:
+        for ch in text:
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif ch == '"':
+                # Quotes only matter inside an object; prose before it is ignored
+                self.in_str = self.depth > 0
+            elif ch == "{":
+                self.depth += 1
+                if self.depth == self.target:
+                    self._buf = []
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if self.depth == self.target - 1 and self._buf is not None:
+                    self._buf.append(ch)
+                    yield "".join(self._buf)
+                    self._buf = None
+                    continue
+            
+            if self._buf is not None:
+                self._buf.append(ch)
+
+
+def _find_json(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, or None.
+    
+    Single pass that tracks brace depth and string/escape state, so braces
+    inside JSON strings are ignored.
+    """
+    for obj in _JSONScanner().feed(text):
+        return obj
+    return None
+
+
 class ColoringBookGenerator:
     """Coloring Book Page Generator"""
     
     def __init__(self, llm_backend: str = "ollama", progress_callback=None):
         self.llm = create_llm_backend(llm_backend)
         self.log = progress_callback or print
+        self._combined: dict[ColoringBookConfig, dict] = {}
     
     def generate_page_ideas(self, config: ColoringBookConfig) -> list[dict]:
         """Generate page ideas for coloring book"""
         self.log(f"📝 Generating {config.pages} page ideas for '{config.theme}' coloring book...")
         
-        prompt = f"""You are a coloring book designer. Create {config.pages} unique page ideas for an adult coloring book.
+        prompt = f"""Create {config.pages} unique page ideas for an adult coloring book.
 
 Theme: {config.theme}
 Difficulty: {config.difficulty}
 
-Requirements:
-- Each page should be unique and interesting
-- Include variety: scenes, patterns, objects, inspirational quotes
-- Consider the target audience (nurses/healthcare workers)
-- Mix detailed illustrations with simpler designs for variety
-
 Output as JSON:
 {{
   "title": "Coloring Book Title",
@@ -63,43 +200,178 @@ Output as JSON:
   ]
 }}"""
 
-        response = self.llm.generate(prompt, max_tokens=4000)
-        return self._parse_json(response)
+        return self._generate_json(prompt, PAGE_IDEAS_SCHEMA, max_tokens=4000)
     
     def generate_image_prompts(self, pages: dict, config: ColoringBookConfig) -> dict:
-        """Generate DALL-E/ChatGPT prompts for coloring pages"""
+        """Generate DALL-E/ChatGPT prompts for coloring pages (one concurrent request per page)"""
         self.log("🎨 Generating image prompts...")
+        return asyncio.run(self._gather_prompts(pages, config))
+    
+    async def _gather_prompts(self, pages: dict, config: ColoringBookConfig) -> dict:
+        """Issue the cover prompt and every page prompt concurrently"""
+        semaphore = asyncio.Semaphore(PROMPT_CONCURRENCY)
+        
+        async def run(prompt: str, schema: dict) -> dict:
+            async with semaphore:
+                try:
+                    return await self.llm.agenerate_json(prompt, schema, system_prompt=SYSTEM_RULES, max_tokens=300)
+                except NotImplementedError:
+                    pass
+                
+                for attempt in range(JSON_ATTEMPTS):
+                    request = prompt + JSON_RETRY_NOTE if attempt else prompt
+                    response = await self.llm.agenerate(request, system_prompt=SYSTEM_RULES, max_tokens=300)
+                    data = self._parse_json(response)
+                    if "raw" not in data:
+                        break
+            return data
         
-        prompt = f"""Create detailed image generation prompts for each coloring book page.
+        cover_prompt = f"""Create an image generation prompt for the cover of a coloring book.
 
 Theme: {config.theme}
-Style: Black and white line art for coloring
-Pages: {json.dumps(pages, indent=2, ensure_ascii=False)}
+Title: {pages.get("title", "")}
 
-For each page, create a prompt that:
-- Specifies "black and white line art, coloring book page"
-- Has clean outlines suitable for coloring
-- NO shading, NO gradients, NO filled areas
-- White background
-- Clear, distinct lines
-- Appropriate complexity for adults
+Output as JSON:
+{{"cover_prompt": "Cover image prompt (can be colored)..."}}"""
+        
+        page_list = pages.get("pages", [])
+        results = await asyncio.gather(
+            run(cover_prompt, COVER_PROMPT_SCHEMA),
+            *[run(self._page_prompt(page, config), PAGE_PROMPT_SCHEMA) for page in page_list],
+        )
+        
+        return {
+            "cover_prompt": results[0].get("cover_prompt", ""),
+            "pages": [
+                {"page": page.get("page", idx), "prompt": result.get("prompt", result.get("raw", ""))}
+                for idx, (page, result) in enumerate(zip(page_list, results[1:]), 1)
+            ],
+        }
+    
+    def _page_prompt(self, page: dict, config: ColoringBookConfig) -> str:
+        """Build the image-prompt request for a single page"""
+        return f"""Create an image generation prompt for one coloring book page.
+
+Theme: {config.theme}
+Page: {dumps(page).decode()}
+
+Output as JSON:
+{{"page": {page.get("page", 1)}, "prompt": "Black and white line art, coloring book page, ..."}}"""
+    
+    def generate_combined(self, config: ColoringBookConfig) -> dict:
+        """Generate page ideas and image prompts in a single LLM call"""
+        if config in self._combined:
+            return self._combined[config]
+        
+        self.log(f"📝 Generating {config.pages} pages and image prompts for '{config.theme}' coloring book...")
+        
+        prompt = f"""Create {config.pages} unique page ideas for an adult coloring book,
+and an image generation prompt for each page idea.
+
+Theme: {config.theme}
+Difficulty: {config.difficulty}
 
 Output as JSON:
 {{
-  "cover_prompt": "Cover image prompt (can be colored)...",
+  "title": "Coloring Book Title",
   "pages": [
+    {{"page": 1, "title": "Page title", "description": "Brief description", "type": "scene|pattern|quote|mandala"}},
+    ...
+  ],
+  "cover_prompt": "Cover image prompt (can be colored)...",
+  "prompts": [
     {{"page": 1, "prompt": "Black and white line art, coloring book page, ..."}},
     ...
   ]
 }}"""
 
-        response = self.llm.generate(prompt, max_tokens=6000)
-        return self._parse_json(response)
+        data = self._generate_json(prompt, COMBINED_SCHEMA, max_tokens=8000)
+        # Unparsed replies are not memoized so a later call can retry
+        if "raw" not in data:
+            self._combined[config] = data
+        return data
+    
+    def stream_image_prompts(self, pages: dict, config: ColoringBookConfig) -> dict:
+        """Generate image prompts in one streamed call.
+        
+        Returns {"cover_prompt": str, "pages": iterator}; each page prompt is
+        parsed and yielded as soon as the model finishes it, so callers such as
+        save_image_prompts can write it while the rest is still decoding.
+        """
+        self.log("🎨 Streaming image prompts...")
+        
+        prompt = f"""Create detailed image generation prompts for the cover and each coloring book page.
+
+Theme: {config.theme}
+Pages: {dumps(pages, indent=True).decode()}
+
+Output as JSON, with the cover first:
+{{
+  "pages": [
+    {{"page": "cover", "prompt": "Cover image prompt (can be colored)..."}},
+    {{"page": 1, "prompt": "Black and white line art, coloring book page, ..."}},
+    ...
+  ]
+}}"""
+        
+        objects = self._stream_objects(prompt, max_tokens=6000)
+        first = next(objects, None)
+        if first is None:
+            return {"cover_prompt": "", "pages": iter(())}
+        if first.get("page") == "cover":
+            return {"cover_prompt": first.get("prompt", ""), "pages": objects}
+        return {"cover_prompt": "", "pages": itertools.chain([first], objects)}
+    
+    def _stream_objects(self, prompt: str, max_tokens: int) -> Iterator[dict]:
+        """Yield each second-level JSON object of a streamed response"""
+        scanner = _JSONScanner(depth=2)
+        for delta in self.llm.generate_stream(prompt, system_prompt=SYSTEM_RULES, max_tokens=max_tokens):
+            for raw in scanner.feed(delta):
+                try:
+                    yield json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+    
+    def _generate_json(self, prompt: str, schema: dict, max_tokens: int) -> dict:
+        """Structured output when the backend supports it, else parse the text reply"""
+        try:
+            return self.llm.generate_json(prompt, schema, system_prompt=SYSTEM_RULES, max_tokens=max_tokens)
+        except NotImplementedError:
+            pass
+        
+        # Re-prompt once if the reply contained no parsable JSON
+        for attempt in range(JSON_ATTEMPTS):
+            request = prompt + JSON_RETRY_NOTE if attempt else prompt
+            response = self.llm.generate(request, system_prompt=SYSTEM_RULES, max_tokens=max_tokens)
+            data = self._parse_json(response)
+            if "raw" not in data:
+                break
+        return data
     
     def _parse_json(self, response: str) -> dict:
         """Extract JSON from LLM response"""
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response)
+        # 1. First balanced object (handles trailing prose after the JSON)
+        candidate = _find_json(response)
+        if candidate is not None:
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                pass
+        
+        # 2. Decode from each '{' position
+        decoder = json.JSONDecoder()
+        idx = response.find("{")
+        while idx != -1:
+            try:
+                obj, _ = decoder.raw_decode(response, idx)
+                if isinstance(obj, dict):
+                    return obj
+            except json.JSONDecodeError:
+                pass
+            idx = response.find("{", idx + 1)
+        
+        # 3. Greedy regex as a last resort
+        json_match = _JSON_RE.search(response)
         if json_match:
             try:
                 return json.loads(json_match.group())
@@ -107,16 +379,31 @@ Output as JSON:
                 pass
         return {"raw": response}
     
-    def generate(self, config: ColoringBookConfig) -> tuple[dict, dict]:
-        """Generate complete coloring book"""
+    def generate(self, config: ColoringBookConfig, prompt_mode: str = "combined") -> tuple[dict, dict]:
+        """Generate complete coloring book
+        
+        prompt_mode selects how image prompts are produced:
+            combined   -- page ideas and prompts in one call (default, fewest requests)
+            concurrent -- page ideas, then one concurrent prompt request per page
+            stream     -- page ideas, then one streamed call; prompts["pages"] is a
+                          lazy iterator that save_image_prompts writes as it decodes
+        """
         self.log(f"📚 Creating coloring book: {config.theme}")
         self.log("=" * 50)
         
-        # Generate page ideas
-        pages = self.generate_page_ideas(config)
-        
-        # Generate image prompts
-        prompts = self.generate_image_prompts(pages, config)
+        if prompt_mode == "combined":
+            # Generate page ideas and image prompts together
+            data = self.generate_combined(config)
+            
+            # Split into the structures expected by save_coloring_book / save_image_prompts
+            pages = {k: data[k] for k in ("title", "pages", "raw") if k in data}
+            prompts = {"cover_prompt": data.get("cover_prompt", ""), "pages": data.get("prompts", [])}
+        else:
+            pages = self.generate_page_ideas(config)
+            if prompt_mode == "stream":
+                prompts = self.stream_image_prompts(pages, config)
+            else:
+                prompts = self.generate_image_prompts(pages, config)
         
         self.log("=" * 50)
         self.log("✅ Coloring book generation complete!")
@@ -124,48 +411,64 @@ Output as JSON:
         return pages, prompts
 
 
-def save_coloring_book(pages: dict, output_dir: Path):
-    """Save coloring book structure"""
-    lines = [f"# {pages.get('title', 'Coloring Book')}\n"]
-    lines.append("A coloring book for relaxation and stress relief.\n")
+def _recorded(items: Iterable, sink: list) -> Iterator:
+    """Yield items unchanged, appending each one to sink"""
+    for item in items:
+        sink.append(item)
+        yield item
+
+
+def _iter_manuscript(pages: dict) -> Iterator[str]:
+    """Yield manuscript.md content block by block"""
+    yield f"# {pages.get('title', 'Coloring Book')}\n\n"
+    yield "A coloring book for relaxation and stress relief.\n"
     
     for page in pages.get("pages", []):
-        page_num = page.get("page", "?")
-        title = page.get("title", "")
-        desc = page.get("description", "")
-        page_type = page.get("type", "")
-        
-        lines.append(f"\n## Page {page_num}: {title}\n")
-        lines.append(f"Type: {page_type}\n")
-        lines.append(f"{desc}\n")
-    
-    path = output_dir / "manuscript.md"
-    path.write_text("\n".join(lines), encoding="utf-8")
-    return path
+        yield _PAGE_BLOCK.format(
+            num=page.get("page", "?"),
+            title=page.get("title", ""),
+            type=page.get("type", ""),
+            desc=page.get("description", ""),
+        )
 
 
-def save_image_prompts(prompts: dict, output_dir: Path):
-    """Save image prompts for ChatGPT"""
-    lines = ["# Coloring Book Image Prompts\n"]
-    lines.append("Copy each prompt to ChatGPT/DALL-E to generate coloring pages.\n")
-    lines.append("**Important:** Request 'black and white line art' for coloring pages.\n")
-    lines.append("=" * 50 + "\n")
+def _iter_prompt_blocks(prompts: dict) -> Iterator[str]:
+    """Yield image_prompts.md content block by block"""
+    yield "# Coloring Book Image Prompts\n"
+    yield "\nCopy each prompt to ChatGPT/DALL-E to generate coloring pages.\n"
+    yield "\n**Important:** Request 'black and white line art' for coloring pages.\n"
+    yield "\n" + "=" * 50 + "\n"
     
     # Cover
     cover = prompts.get("cover_prompt", "")
     if cover:
-        lines.append("## Cover (Can be colored)\n")
-        lines.append(f"```\n{cover}\n```\n")
+        yield f"\n## Cover (Can be colored)\n\n```\n{cover}\n```\n"
     
     # Pages
     for page in prompts.get("pages", []):
-        page_num = page.get("page", "?")
-        prompt = page.get("prompt", "")
-        lines.append(f"\n## Page {page_num}\n")
-        lines.append(f"```\n{prompt}\n```\n")
+        yield f"\n\n## Page {page.get('page', '?')}\n\n```\n{page.get('prompt', '')}\n```\n"
+
+
+def save_coloring_book(pages: dict, output_dir: Path):
+    """Save coloring book structure"""
+    path = output_dir / "manuscript.md"
+    with path.open("w", encoding="utf-8") as f:
+        f.writelines(_iter_manuscript(pages))
+    return path
+
+
+def save_image_prompts(prompts: dict, output_dir: Path):
+    """Save image prompts for ChatGPT
     
+    prompts["pages"] may be a lazy iterator (see stream_image_prompts); each
+    page block is written and flushed as soon as it is produced.
+    """
     path = output_dir / "image_prompts.md"
-    path.write_text("\n".join(lines), encoding="utf-8")
+    with path.open("w", encoding="utf-8") as f:
+        for block in _iter_prompt_blocks(prompts):
+            f.write(block)
+            f.flush()
+    
     return path
 
 
@@ -184,7 +487,12 @@ Example:
     parser.add_argument("--theme", "-t", required=True, help="Coloring book theme")
     parser.add_argument("--pages", "-p", type=int, default=30, help="Number of pages (default: 30)")
     parser.add_argument("--difficulty", "-d", default="medium", choices=["simple", "medium", "detailed"])
-    parser.add_argument("--backend", default="ollama", help="LLM backend: ollama, claude, mock")
+    parser.add_argument("--backend", default="ollama", help="LLM backend: ollama, claude, claude-async, mock")
+    parser.add_argument(
+        "--prompts", default="combined", choices=["combined", "concurrent", "stream"],
+        help="Image prompt generation: one combined call (default), one request per page, "
+             "or one streamed call written as it decodes",
+    )
     
     args = parser.parse_args()
     
@@ -199,15 +507,22 @@ Example:
     
     try:
         generator = ColoringBookGenerator(llm_backend=args.backend)
-        pages, prompts = generator.generate(config)
+        pages, prompts = generator.generate(config, prompt_mode=args.prompts)
+        
+        # Streamed page prompts are consumed by save_image_prompts; keep a copy for the raw JSON
+        streamed: list = []
+        if not isinstance(prompts["pages"], list):
+            prompts["pages"] = _recorded(prompts["pages"], streamed)
         
         # Save outputs
         manuscript_path = save_coloring_book(pages, book_dir)
         prompts_path = save_image_prompts(prompts, book_dir)
+        if not isinstance(prompts["pages"], list):
+            prompts["pages"] = streamed
         
         # Save raw JSON
         json_path = book_dir / "coloring_data.json"
-        json_path.write_text(json.dumps({"pages": pages, "prompts": prompts}, indent=2, ensure_ascii=False), encoding="utf-8")
+        json_path.write_bytes(dumps({"pages": pages, "prompts": prompts}, indent=True))
         
         print(f"\n📄 Structure: {manuscript_path}")
         print(f"🎨 Image prompts: {prompts_path}")
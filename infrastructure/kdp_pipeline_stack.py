@@ -26,7 +26,11 @@ AWS 리소스
 ──────────
   S3              — 콘텐츠·표지·PDF 아티팩트 저장
   Lambda ×4       — ContentGen / CoverDesign / PdfAssembler / KdpUploader
+  Lambda Layer    — 4개 Lambda 공용 Python 의존성 (src/shared/requirements.txt)
+                    + 폰트 (src/fonts/fonts.txt → /opt/fonts, PdfAssembler 전용)
   Step Functions  — 파이프라인 오케스트레이션 (Parallel + Catch)
+                    -c use_batch_api=1 이면 ContentGen이 OpenAI Batch API로 제출하고
+                    Wait → ContentBatchPoller 루프로 결과 수집
   SNS             — 성공·실패 알림
   Secrets Manager — OpenAI API Key, KDP 자격증명
 """
@@ -55,6 +59,9 @@ class KdpPipelineStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # cdk deploy -c use_batch_api=1 → 챕터 생성을 OpenAI Batch API로 (비용 50%, 최대 24시간)
+        use_batch_api = str(self.node.try_get_context("use_batch_api") or "0") == "1"
+
         # ── S3: 아티팩트 저장소 ──────────────────────────────────────
         assets_bucket = s3.Bucket(
             self,
@@ -85,6 +92,50 @@ class KdpPipelineStack(Stack):
             topic_name="kdp-pipeline-notifications",
         )
 
+        # ── 공용 의존성 Layer ────────────────────────────────────────
+        # pip 설치는 Layer에서 한 번만 수행하고 4개 Lambda가 공유
+        deps_layer = _lambda.LayerVersion(
+            self,
+            "DepsLayer",
+            code=_lambda.Code.from_asset(
+                path=os.path.join(PROJECT_ROOT, "src", "shared"),
+                bundling=BundlingOptions(
+                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+                    # wheel 전용 + .pyc 미생성으로 번들 시간·Layer 크기 축소
+                    command=[
+                        "bash", "-c",
+                        "pip install --no-compile --only-binary=:all: "
+                        "--platform manylinux2014_x86_64 --implementation cp "
+                        "--python-version 3.12 "
+                        "-t /asset-output/python -r requirements.txt "
+                        "&& find /asset-output -name '__pycache__' -prune -exec rm -rf {} +",
+                    ],
+                ),
+            ),
+            compatible_runtimes=[_lambda.Runtime.PYTHON_3_12],
+            description="KDP pipeline shared Python dependencies",
+        )
+
+        # ── 폰트 Layer ───────────────────────────────────────────────
+        # 한국어 폰트를 배포 시 한 번 내려받아 /opt/fonts 로 제공 (콜드 스타트 다운로드 제거)
+        fonts_layer = _lambda.LayerVersion(
+            self,
+            "FontsLayer",
+            code=_lambda.Code.from_asset(
+                path=os.path.join(PROJECT_ROOT, "src", "fonts"),
+                bundling=BundlingOptions(
+                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+                    command=[
+                        "bash", "-c",
+                        "mkdir -p /asset-output/fonts && grep -v '^#' fonts.txt | "
+                        "xargs -n1 python -c \"import sys, urllib.request; "
+                        "u = sys.argv[1]; urllib.request.urlretrieve(u, '/asset-output/fonts/' + u.rsplit('/', 1)[1])\"",
+                    ],
+                ),
+            ),
+            description="KDP pipeline fonts (Noto Sans KR)",
+        )
+
         # ── Lambda 생성 헬퍼 ─────────────────────────────────────────
         def make_lambda(
             id: str,
@@ -92,23 +143,20 @@ class KdpPipelineStack(Stack):
             env: dict,
             timeout_min: int = 1,
             memory_mb: int = 256,
+            handler: str = "handler.lambda_handler",
+            extra_layers: tuple = (),
         ) -> _lambda.Function:
             return _lambda.Function(
                 self,
                 id,
                 runtime=_lambda.Runtime.PYTHON_3_12,
-                handler="handler.lambda_handler",
+                handler=handler,
+                # 소스만 패키징 (의존성은 deps_layer) — Docker 번들링 불필요
                 code=_lambda.Code.from_asset(
                     path=os.path.join(PROJECT_ROOT, "src", src_dir),
-                    bundling=BundlingOptions(
-                        image=_lambda.Runtime.PYTHON_3_12.bundling_image,
-                        command=[
-                            "bash", "-c",
-                            "pip install -t /asset-output -r requirements.txt "
-                            "&& cp -au /asset-input/. /asset-output",
-                        ],
-                    ),
+                    exclude=["requirements.txt"],
                 ),
+                layers=[deps_layer, *extra_layers],
                 environment=env,
                 timeout=Duration.minutes(timeout_min),
                 memory_size=memory_mb,
@@ -121,9 +169,16 @@ class KdpPipelineStack(Stack):
             "OPENAI_SECRET_ARN": openai_secret.secret_arn,
         }
 
-        content_fn = make_lambda("ContentGenerator", "content_generator", common_env, timeout_min=5, memory_mb=512)
+        content_fn = make_lambda(
+            "ContentGenerator", "content_generator",
+            {**common_env, "USE_BATCH_API": "1" if use_batch_api else "0"},
+            timeout_min=5, memory_mb=512,
+        )
         cover_fn   = make_lambda("CoverDesigner",    "cover_designer",    common_env, timeout_min=3, memory_mb=512)
-        pdf_fn     = make_lambda("PdfAssembler",     "pdf_assembler",     common_env, timeout_min=5, memory_mb=1024)
+        pdf_fn     = make_lambda(
+            "PdfAssembler", "pdf_assembler", common_env,
+            timeout_min=5, memory_mb=1024, extra_layers=(fonts_layer,),
+        )
         upload_fn  = make_lambda(
             "KdpUploader", "kdp_uploader",
             {**common_env, "KDP_SECRET_ARN": kdp_secret.secret_arn, "UPLOAD_MODE": "MANIFEST_ONLY"},
@@ -138,10 +193,24 @@ class KdpPipelineStack(Stack):
 
         openai_secret.grant_read(content_fn)
         openai_secret.grant_read(cover_fn)
+
+        # 배치 결과 수집 Lambda (같은 소스, poll_handler 진입점)
+        if use_batch_api:
+            content_poll_fn = make_lambda(
+                "ContentBatchPoller", "content_generator", common_env,
+                timeout_min=5, memory_mb=512, handler="handler.poll_handler",
+            )
+            assets_bucket.grant_read_write(content_poll_fn)
+            openai_secret.grant_read(content_poll_fn)
         kdp_secret.grant_read(upload_fn)
 
         # ── Step Functions 상태 정의 ──────────────────────────────────
 
+        # — 여러 Task가 공유하는 입력 경로 —
+        jp_book_id = sfn.JsonPath.string_at("$.book_id")
+        jp_title   = sfn.JsonPath.string_at("$.title")
+        jp_author  = sfn.JsonPath.string_at("$.author")
+
         # — 실패 알림 (종료 상태) —
         notify_failure = tasks.SnsPublish(
             self, "NotifyFailure",
@@ -160,37 +229,78 @@ class KdpPipelineStack(Stack):
             message=sfn.TaskInput.from_object({
                 "pipeline": "kdp-publishing-pipeline",
                 "status": "PUBLISHED",
-                "book_id": sfn.JsonPath.string_at("$.book_id"),
-                "title":   sfn.JsonPath.string_at("$.title"),
+                "book_id": jp_book_id,
+                "title":   jp_title,
                 "asin":    sfn.JsonPath.string_at("$.upload_result.asin"),
             }),
         )
 
+        def catch_to_fail(state) -> None:
+            """모든 오류를 실패 알림으로 라우팅"""
+            state.add_catch(notify_failure, errors=["States.ALL"], result_path="$.error")
+
         # — Task: 콘텐츠 생성 —
         generate_content = tasks.LambdaInvoke(
             self, "GenerateContent",
             lambda_function=content_fn,
             payload=sfn.TaskInput.from_object({
-                "book_id":  sfn.JsonPath.string_at("$.book_id"),
-                "title":    sfn.JsonPath.string_at("$.title"),
+                "book_id":  jp_book_id,
+                "title":    jp_title,
                 "topic":    sfn.JsonPath.string_at("$.topic"),
                 "outline":  sfn.JsonPath.string_at("$.outline"),
                 "language": sfn.JsonPath.string_at("$.language"),
             }),
             result_selector={
+                "batch_id": sfn.JsonPath.string_at("$.Payload.batch_id"),
+                "chapters": sfn.JsonPath.list_at("$.Payload.chapters"),
+            } if use_batch_api else {
                 "content_s3_key": sfn.JsonPath.string_at("$.Payload.content_s3_key"),
                 "word_count":     sfn.JsonPath.number_at("$.Payload.word_count"),
             },
+            result_path="$.batch" if use_batch_api else "$",
         )
         generate_content.add_retry(sfn.Retry(errors=["Lambda.ServiceException"], max_attempts=2))
+        content_branch = generate_content
+
+        # — 배치 모드: Wait → Poll → Choice 루프 (완료 시 실시간 모드와 같은 출력) —
+        if use_batch_api:
+            wait_batch = sfn.Wait(
+                self, "WaitContentBatch",
+                time=sfn.WaitTime.duration(Duration.minutes(10)),
+            )
+            poll_content = tasks.LambdaInvoke(
+                self, "PollContentBatch",
+                lambda_function=content_poll_fn,
+                payload=sfn.TaskInput.from_object({
+                    "book_id":  jp_book_id,
+                    "title":    jp_title,
+                    "batch_id": sfn.JsonPath.string_at("$.batch.batch_id"),
+                    "chapters": sfn.JsonPath.list_at("$.batch.chapters"),
+                }),
+                result_path="$.poll",
+                result_selector={"result": sfn.JsonPath.object_at("$.Payload")},
+            )
+            poll_content.add_retry(sfn.Retry(errors=["Lambda.ServiceException"], max_attempts=2))
+            content_ready = sfn.Pass(
+                self, "ContentReady",
+                parameters={
+                    "content_s3_key": sfn.JsonPath.string_at("$.poll.result.content_s3_key"),
+                    "word_count":     sfn.JsonPath.number_at("$.poll.result.word_count"),
+                },
+            )
+            content_branch = generate_content.next(wait_batch).next(poll_content).next(
+                sfn.Choice(self, "ContentBatchDone?")
+                .when(sfn.Condition.string_equals("$.poll.result.status", "completed"), content_ready)
+                .otherwise(wait_batch)
+            )
 
         # — Task: 표지 생성 —
         generate_cover = tasks.LambdaInvoke(
             self, "GenerateCover",
             lambda_function=cover_fn,
             payload=sfn.TaskInput.from_object({
-                "book_id": sfn.JsonPath.string_at("$.book_id"),
-                "title":   sfn.JsonPath.string_at("$.title"),
+                "book_id": jp_book_id,
+                "title":   jp_title,
                 "genre":   sfn.JsonPath.string_at("$.genre"),
                 "style":   sfn.JsonPath.string_at("$.style"),
             }),
@@ -205,18 +315,18 @@ class KdpPipelineStack(Stack):
             self, "ParallelGeneration",
             result_path="$.parallel_result",
         )
-        parallel.add_branch(generate_content)
+        parallel.add_branch(content_branch)
         parallel.add_branch(generate_cover)
-        parallel.add_catch(sfn.CatchProps(errors=["States.ALL"], result_path="$.error", next_state=notify_failure))
+        catch_to_fail(parallel)
 
         # — Task: PDF 조립 —
         assemble_pdf = tasks.LambdaInvoke(
             self, "AssemblePDF",
             lambda_function=pdf_fn,
             payload=sfn.TaskInput.from_object({
-                "book_id":        sfn.JsonPath.string_at("$.book_id"),
-                "title":          sfn.JsonPath.string_at("$.title"),
-                "author":         sfn.JsonPath.string_at("$.author"),
+                "book_id":        jp_book_id,
+                "title":          jp_title,
+                "author":         jp_author,
                 "content_s3_key": sfn.JsonPath.string_at("$.parallel_result[0].content_s3_key"),
                 "cover_s3_key":   sfn.JsonPath.string_at("$.parallel_result[1].cover_s3_key"),
             }),
@@ -226,16 +336,16 @@ class KdpPipelineStack(Stack):
                 "cover_pdf_s3_key": sfn.JsonPath.string_at("$.Payload.cover_pdf_s3_key"),
             },
         )
-        assemble_pdf.add_catch(sfn.CatchProps(errors=["States.ALL"], result_path="$.error", next_state=notify_failure))
+        catch_to_fail(assemble_pdf)
 
         # — Task: KDP 업로드 —
         kdp_upload = tasks.LambdaInvoke(
             self, "UploadToKDP",
             lambda_function=upload_fn,
             payload=sfn.TaskInput.from_object({
-                "book_id":         sfn.JsonPath.string_at("$.book_id"),
-                "title":           sfn.JsonPath.string_at("$.title"),
-                "author":          sfn.JsonPath.string_at("$.author"),
+                "book_id":         jp_book_id,
+                "title":           jp_title,
+                "author":          jp_author,
                 "description":     sfn.JsonPath.string_at("$.description"),
                 "keywords":        sfn.JsonPath.string_at("$.keywords"),
                 "categories":      sfn.JsonPath.string_at("$.categories"),
@@ -250,7 +360,7 @@ class KdpPipelineStack(Stack):
                 "manifest_s3_key": sfn.JsonPath.string_at("$.Payload.manifest_s3_key"),
             },
         )
-        kdp_upload.add_catch(sfn.CatchProps(errors=["States.ALL"], result_path="$.error", next_state=notify_failure))
+        catch_to_fail(kdp_upload)
 
         # ── 상태 연결: Parallel → PDF → Upload → 성공 알림 ────────────
         parallel.next(assemble_pdf)
@@ -263,7 +373,8 @@ class KdpPipelineStack(Stack):
             "KdpPipeline",
             state_machine_name="kdp-publishing-pipeline",
             definition_body=sfn.DefinitionBody.from_chainable(parallel),
-            timeout=Duration.hours(1),
+            # Batch API completion_window(24h) + 여유
+            timeout=Duration.hours(25 if use_batch_api else 1),
             log_configuration=sfn.LogConfiguration(
                 destinations=[logs.LogGroup(self, "PipelineLogGroup")],
                 level=sfn.LogLevel.ALL,
@@ -1,21 +1,50 @@
 """
 AI Backend Modules
 LLM 및 이미지 생성 백엔드
+
+구현 모듈은 실제로 사용될 때 import (anthropic, requests, PIL 등의 로드 지연)
 """
 
-from .llm_base import LLMBackend, TokenUsage
-from .ollama import OllamaBackend, OllamaConnectionError
-from .claude import ClaudeBackend, ClaudeAPIError
+import importlib
+import inspect
+
+from .llm_base import CachedLLMBackend, LLMBackend, TokenUsage
 from .image_base import ImageBackend
-from .stable_diffusion import StableDiffusionBackend
-from .mock import MockLLMBackend, MockImageBackend
+
+# 지연 로드 대상: 공개 이름 → 구현 모듈
+_LAZY_EXPORTS = {
+    "OllamaBackend": ".ollama",
+    "OllamaConnectionError": ".ollama",
+    "ClaudeBackend": ".claude",
+    "AsyncClaudeBackend": ".claude",
+    "ClaudeAPIError": ".claude",
+    "StableDiffusionBackend": ".stable_diffusion",
+    "MockLLMBackend": ".mock",
+    "MockImageBackend": ".mock",
+}
+
+# 백엔드 타입 → (모듈, 클래스)
+_LLM_FACTORIES = {
+    "ollama": (".ollama", "OllamaBackend"),
+    "claude": (".claude", "ClaudeBackend"),
+    "claude-async": (".claude", "AsyncClaudeBackend"),
+    "mock": (".mock", "MockLLMBackend"),
+}
+
+_IMAGE_FACTORIES = {
+    "stable_diffusion": (".stable_diffusion", "StableDiffusionBackend"),
+    "sd": (".stable_diffusion", "StableDiffusionBackend"),
+    "mock": (".mock", "MockImageBackend"),
+}
 
 __all__ = [
     "LLMBackend",
+    "CachedLLMBackend",
     "TokenUsage",
     "OllamaBackend",
     "OllamaConnectionError",
     "ClaudeBackend",
+    "AsyncClaudeBackend",
     "ClaudeAPIError",
     "ImageBackend",
     "StableDiffusionBackend",
@@ -26,12 +55,29 @@ __all__ = [
 ]
 
 
+def __getattr__(name: str):
+    """구현 클래스 지연 import (PEP 562)"""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def _load(module: str, cls_name: str, kwargs: dict):
+    """레지스트리 항목의 클래스를 import하고 생성자가 받는 인자만 전달"""
+    cls = getattr(importlib.import_module(module, __name__), cls_name)
+    params = inspect.signature(cls.__init__).parameters
+    return cls(**{k: v for k, v in kwargs.items() if k in params})
+
+
 def create_llm_backend(backend_type: str, **kwargs) -> LLMBackend:
     """
     LLM 백엔드 팩토리 함수
     
     Args:
-        backend_type: 백엔드 타입 ("ollama" | "claude" | "mock")
+        backend_type: 백엔드 타입 ("ollama" | "claude" | "claude-async" | "mock")
         **kwargs: 백엔드별 추가 인자
         
     Returns:
@@ -39,23 +85,12 @@ def create_llm_backend(backend_type: str, **kwargs) -> LLMBackend:
     """
     backend_type = backend_type.lower()
     
-    if backend_type == "ollama":
-        return OllamaBackend(
-            model=kwargs.get("model", "llama3.1"),
-            base_url=kwargs.get("base_url"),
-        )
-    elif backend_type == "claude":
-        return ClaudeBackend(
-            api_key=kwargs.get("api_key"),
-            model=kwargs.get("model", "claude-3-5-sonnet-20241022"),
-        )
-    elif backend_type == "mock":
-        return MockLLMBackend()
-    else:
+    if backend_type not in _LLM_FACTORIES:
         raise ValueError(
             f"지원하지 않는 백엔드: {backend_type}\n"
-            "지원 백엔드: ollama, claude, mock"
+            "지원 백엔드: ollama, claude, claude-async, mock"
         )
+    return _load(*_LLM_FACTORIES[backend_type], kwargs)
 
 
 def create_image_backend(backend_type: str, **kwargs) -> ImageBackend:
@@ -71,14 +106,9 @@ def create_image_backend(backend_type: str, **kwargs) -> ImageBackend:
     """
     backend_type = backend_type.lower()
     
-    if backend_type == "stable_diffusion" or backend_type == "sd":
-        return StableDiffusionBackend(
-            base_url=kwargs.get("base_url"),
-        )
-    elif backend_type == "mock":
-        return MockImageBackend()
-    else:
+    if backend_type not in _IMAGE_FACTORIES:
         raise ValueError(
             f"지원하지 않는 이미지 백엔드: {backend_type}\n"
             "지원 백엔드: stable_diffusion, mock"
         )
+    return _load(*_IMAGE_FACTORIES[backend_type], kwargs)
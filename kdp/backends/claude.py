@@ -3,10 +3,26 @@ Claude Backend
 Anthropic Claude API를 통한 LLM 호출
 """
 
+import asyncio
+import json
 import os
-from typing import Optional
+from typing import Iterator, Optional
 
-from .llm_base import LLMBackend
+from .llm_base import CachedLLMBackend, LLMBackend
+
+# generate_json에서 구조화 출력을 받기 위한 강제 호출 도구 이름
+JSON_TOOL_NAME = "return_result"
+
+# 429/5xx 등 일시적 오류 재시도 횟수 (SDK가 지수 백오프 + 지터 적용)
+MAX_RETRIES = 4
+
+# api_key별로 공유하는 Anthropic 클라이언트 (httpx 커넥션 풀 재사용)
+_CLIENTS: dict = {}
+
+# 연결은 빨리 포기하되, 비스트리밍 호출은 응답 전체가 생성될 때까지 아무것도
+# 오지 않으므로 읽기 제한은 SDK 기본값(600초)을 유지 (8000토큰 호출이 60초를 넘김)
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 600.0
 
 
 class ClaudeAPIError(Exception):
@@ -14,7 +30,7 @@ class ClaudeAPIError(Exception):
     pass
 
 
-class ClaudeBackend(LLMBackend):
+class ClaudeBackend(CachedLLMBackend, LLMBackend):
     """Claude 백엔드 구현"""
     
     # Claude 모델별 가격 (USD per 1M tokens)
@@ -35,6 +51,11 @@ class ClaudeBackend(LLMBackend):
         self.model = model
         self._client = None
         
+        # 모델별 100만 토큰당 단가를 토큰당 단가로 미리 계산
+        pricing = self.PRICING.get(model, {"input": 3.0, "output": 15.0})
+        self._in_rate = pricing["input"] / 1_000_000
+        self._out_rate = pricing["output"] / 1_000_000
+        
         if not self.api_key:
             raise ClaudeAPIError(
                 "ANTHROPIC_API_KEY가 설정되지 않았습니다.\n"
@@ -47,45 +68,250 @@ class ClaudeBackend(LLMBackend):
     
     @property
     def client(self):
-        """Lazy initialization of Anthropic client"""
+        """Anthropic client shared per API key across backend instances"""
         if self._client is None:
-            try:
-                import anthropic
-                self._client = anthropic.Anthropic(api_key=self.api_key)
-            except ImportError:
-                raise ClaudeAPIError(
-                    "anthropic 패키지가 설치되지 않았습니다.\n"
-                    "pip install anthropic"
+            client = _CLIENTS.get(self.api_key)
+            if client is None:
+                try:
+                    import anthropic
+                except ImportError:
+                    raise ClaudeAPIError(
+                        "anthropic 패키지가 설치되지 않았습니다.\n"
+                        "pip install anthropic"
+                    )
+                client = anthropic.Anthropic(
+                    api_key=self.api_key,
+                    max_retries=MAX_RETRIES,
+                    timeout=anthropic.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
                 )
+                _CLIENTS[self.api_key] = client
+            self._client = client
         return self._client
     
-    def generate(self, prompt: str, system_prompt: str = "") -> str:
+    def _request_params(self, prompt: str, system_prompt: str, max_tokens: int) -> dict:
+        """messages.create 요청 파라미터 구성"""
+        # 고정 시스템 프롬프트에 캐시 브레이크포인트를 두어 반복 호출 시 입력 비용 절감
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": [
+                {
+                    "type": "text",
+                    "text": system_prompt if system_prompt else "You are a helpful assistant.",
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+        }
+    
+    def _record_usage(self, usage):
+        """토큰 사용량 추적"""
+        self.token_usage.add(
+            usage.input_tokens,
+            usage.output_tokens,
+            getattr(usage, "cache_read_input_tokens", 0) or 0,
+            getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        )
+    
+    def generate(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> str:
         """Claude API를 통한 텍스트 생성"""
+        cached = self._cache_get(prompt, system_prompt, max_tokens)
+        if cached is not None:
+            return cached
+        
         try:
             message = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=system_prompt if system_prompt else "You are a helpful assistant.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+                **self._request_params(prompt, system_prompt, max_tokens)
             )
         except Exception as e:
             raise ClaudeAPIError(f"Claude API 호출 실패: {e}")
         
-        # 토큰 사용량 추적
-        input_tokens = message.usage.input_tokens
-        output_tokens = message.usage.output_tokens
-        self.token_usage.add(input_tokens, output_tokens)
+        self._record_usage(message.usage)
         
         # 응답 텍스트 추출
-        return message.content[0].text
+        text = message.content[0].text
+        self._cache_set(prompt, system_prompt, max_tokens, text, self._truncated(message))
+        return text
+    
+    def _json_params(self, prompt: str, schema: dict, system_prompt: str, max_tokens: int) -> dict:
+        """tool_use로 스키마에 맞는 JSON 출력을 강제하는 요청 파라미터"""
+        params = self._request_params(prompt, system_prompt, max_tokens)
+        params["tools"] = [
+            {
+                "name": JSON_TOOL_NAME,
+                "description": "Return the result as structured JSON.",
+                "input_schema": schema,
+            }
+        ]
+        params["tool_choice"] = {"type": "tool", "name": JSON_TOOL_NAME}
+        return params
+    
+    @staticmethod
+    def _json_cache_system(system_prompt: str, schema: dict) -> str:
+        """스키마별로 캐시 키가 달라지도록 시스템 프롬프트에 스키마를 덧붙임"""
+        return f"{system_prompt}\n#schema:{json.dumps(schema, sort_keys=True)}"
+    
+    @staticmethod
+    def _truncated(message) -> bool:
+        """max_tokens 한도에서 잘린 응답 여부 (캐시 제외 대상)"""
+        return message.stop_reason == "max_tokens"
+    
+    @staticmethod
+    def _tool_input(message) -> dict:
+        """응답에서 tool_use 블록의 입력(dict) 추출"""
+        for block in message.content:
+            if block.type == "tool_use":
+                return block.input
+        raise ClaudeAPIError("Claude 응답에 tool_use 블록이 없습니다.")
+    
+    def generate_json(
+        self,
+        prompt: str,
+        schema: dict,
+        system_prompt: str = "",
+        max_tokens: int = 4096,
+    ) -> dict:
+        """tool_use를 통한 구조화 JSON 생성 (응답 파싱 불필요)"""
+        cache_system = self._json_cache_system(system_prompt, schema)
+        cached = self._cache_get(prompt, cache_system, max_tokens)
+        if cached is not None:
+            return json.loads(cached)
+        
+        try:
+            message = self.client.messages.create(
+                **self._json_params(prompt, schema, system_prompt, max_tokens)
+            )
+        except Exception as e:
+            raise ClaudeAPIError(f"Claude API 호출 실패: {e}")
+        
+        self._record_usage(message.usage)
+        
+        result = self._tool_input(message)
+        self._cache_set(
+            prompt, cache_system, max_tokens,
+            json.dumps(result, ensure_ascii=False), self._truncated(message),
+        )
+        return result
+    
+    def generate_stream(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> Iterator[str]:
+        """Claude 스트리밍 API를 통한 텍스트 생성 (텍스트 조각 yield)"""
+        cached = self._cache_get(prompt, system_prompt, max_tokens)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            with self.client.messages.stream(
+                **self._request_params(prompt, system_prompt, max_tokens)
+            ) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    yield text
+                message = stream.get_final_message()
+        except Exception as e:
+            raise ClaudeAPIError(f"Claude API 호출 실패: {e}")
+        
+        self._record_usage(message.usage)
+        self._cache_set(prompt, system_prompt, max_tokens, "".join(chunks), self._truncated(message))
     
     def estimate_cost(self) -> float:
         """예상 비용 계산 (USD)"""
-        pricing = self.PRICING.get(self.model, {"input": 3.0, "output": 15.0})
+        usage = self.token_usage
+        # 캐시 읽기는 입력 가격의 10%, 캐시 쓰기는 125%
+        return (
+            (
+                usage.input_tokens
+                + usage.cache_read_input_tokens * 0.1
+                + usage.cache_creation_input_tokens * 1.25
+            ) * self._in_rate
+            + usage.output_tokens * self._out_rate
+        )
+
+
+class AsyncClaudeBackend(ClaudeBackend):
+    """AsyncAnthropic 클라이언트를 사용하는 Claude 백엔드 (동시 요청용)"""
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "claude-3-5-sonnet-20241022",
+    ):
+        super().__init__(api_key=api_key, model=model)
+        self._async_client = None
+        self._async_loop = None
+    
+    @property
+    def async_client(self):
+        """
+        현재 이벤트 루프 전용 AsyncAnthropic 클라이언트
+        
+        asyncio.run()마다 새 루프가 만들어지고, 닫힌 루프에 묶인 httpx 커넥션은
+        재사용할 수 없으므로 루프가 바뀌면 클라이언트를 새로 생성.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            try:
+                import anthropic
+            except ImportError:
+                raise ClaudeAPIError(
+                    "anthropic 패키지가 설치되지 않았습니다.\n"
+                    "pip install anthropic"
+                )
+            self._async_client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                max_retries=MAX_RETRIES,
+                timeout=anthropic.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    async def agenerate(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> str:
+        """AsyncAnthropic을 통한 비동기 텍스트 생성"""
+        cached = self._cache_get(prompt, system_prompt, max_tokens)
+        if cached is not None:
+            return cached
+        
+        try:
+            message = await self.async_client.messages.create(
+                **self._request_params(prompt, system_prompt, max_tokens)
+            )
+        except Exception as e:
+            raise ClaudeAPIError(f"Claude API 호출 실패: {e}")
+        
+        self._record_usage(message.usage)
+        
+        text = message.content[0].text
+        self._cache_set(prompt, system_prompt, max_tokens, text, self._truncated(message))
+        return text
+    
+    async def agenerate_json(
+        self,
+        prompt: str,
+        schema: dict,
+        system_prompt: str = "",
+        max_tokens: int = 4096,
+    ) -> dict:
+        """AsyncAnthropic + tool_use를 통한 비동기 구조화 JSON 생성"""
+        cache_system = self._json_cache_system(system_prompt, schema)
+        cached = self._cache_get(prompt, cache_system, max_tokens)
+        if cached is not None:
+            return json.loads(cached)
+        
+        try:
+            message = await self.async_client.messages.create(
+                **self._json_params(prompt, schema, system_prompt, max_tokens)
+            )
+        except Exception as e:
+            raise ClaudeAPIError(f"Claude API 호출 실패: {e}")
         
-        input_cost = (self.token_usage.input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (self.token_usage.output_tokens / 1_000_000) * pricing["output"]
+        self._record_usage(message.usage)
         
-        return input_cost + output_cost
+        result = self._tool_input(message)
+        self._cache_set(
+            prompt, cache_system, max_tokens,
+            json.dumps(result, ensure_ascii=False), self._truncated(message),
+        )
+        return result
@@ -0,0 +1,26 @@
+"""
+HTTP 세션 헬퍼
+로컬 서버 백엔드(Ollama, Stable Diffusion)가 공유하는 keep-alive 세션 생성
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_size: int = 16) -> requests.Session:
+    """
+    커넥션 풀을 재사용하는 requests 세션 생성
+    
+    동시 챕터 생성 시에도 연결을 재사용하도록 풀 크기를 워커 수 이상으로 두고,
+    연결 실패는 짧은 백오프로 최대 2회 재시도.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -3,12 +3,15 @@ Image Backend 추상 클래스
 """
 
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import List, Tuple
 
 
 class ImageBackend(ABC):
     """이미지 생성 백엔드 추상 클래스"""
     
+    # 슬롯을 쓰는 하위 클래스가 __dict__ 없이 생성되도록 빈 슬롯 선언
+    __slots__ = ()
+    
     @abstractmethod
     def generate(self, prompt: str, size: Tuple[int, int] = (1024, 1024)) -> bytes:
         """
@@ -23,6 +26,15 @@ class ImageBackend(ABC):
         """
         pass
     
+    def generate_batch(self, prompts: List[str], size: Tuple[int, int] = (1024, 1024)) -> List[bytes]:
+        """
+        여러 이미지 생성 (프롬프트 순서대로 PNG 바이트 반환)
+        
+        기본 구현은 generate()를 순서대로 호출. 한 요청에 여러 장을 생성할 수
+        있는 백엔드는 재정의.
+        """
+        return [self.generate(prompt, size) for prompt in prompts]
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -2,50 +2,142 @@
 LLM Backend 추상 클래스
 """
 
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import ClassVar, Iterator, Optional
 
 
-@dataclass
+def atomic_write(path: Path, data: bytes):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 교체 (동시 실행 시 잘린 캐시 파일 방지)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+@dataclass(slots=True)
 class TokenUsage:
-    """토큰 사용량 추적"""
+    """토큰 사용량 추적 (비동기 배치에서 동시에 add()가 호출될 수 있음)"""
     input_tokens: int = 0
     output_tokens: int = 0
-    total_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
     
-    def add(self, input_tokens: int, output_tokens: int):
+    # 인스턴스마다 락을 두지 않도록 클래스 레벨에서 공유
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+    
+    def add(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_input_tokens: int = 0,
+        cache_creation_input_tokens: int = 0,
+    ):
         """토큰 사용량 추가"""
-        self.input_tokens += input_tokens
-        self.output_tokens += output_tokens
-        self.total_tokens = self.input_tokens + self.output_tokens
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cache_read_input_tokens += cache_read_input_tokens
+            self.cache_creation_input_tokens += cache_creation_input_tokens
 
 
 class LLMBackend(ABC):
     """LLM 백엔드 추상 클래스"""
     
+    # 슬롯을 쓰는 하위 클래스(Mock 등)가 __dict__ 없이 생성되도록 슬롯 선언.
+    # __slots__가 없는 하위 클래스는 평소처럼 __dict__를 가짐
+    __slots__ = ("token_usage",)
+    
     def __init__(self):
         self.token_usage = TokenUsage()
     
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: str = "") -> str:
+    def generate(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> str:
         """
         텍스트 생성
         
         Args:
             prompt: 사용자 프롬프트
             system_prompt: 시스템 프롬프트 (선택)
+            max_tokens: 최대 출력 토큰 수
             
         Returns:
             생성된 텍스트
         """
         pass
     
+    async def agenerate(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> str:
+        """
+        비동기 텍스트 생성
+        
+        기본 구현은 generate()를 스레드에서 실행. 네이티브 비동기 클라이언트가
+        있는 백엔드는 재정의.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt, max_tokens)
+    
+    def generate_stream(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> Iterator[str]:
+        """
+        스트리밍 텍스트 생성 (텍스트 조각을 순서대로 yield)
+        
+        기본 구현은 generate() 결과 전체를 한 번에 yield.
+        """
+        yield self.generate(prompt, system_prompt, max_tokens)
+    
+    def generate_json(
+        self,
+        prompt: str,
+        schema: dict,
+        system_prompt: str = "",
+        max_tokens: int = 4096,
+    ) -> dict:
+        """
+        스키마를 강제한 구조화 JSON 생성
+        
+        Args:
+            prompt: 사용자 프롬프트
+            schema: 응답 JSON Schema (최상위는 object)
+            system_prompt: 시스템 프롬프트 (선택)
+            max_tokens: 최대 출력 토큰 수
+            
+        Returns:
+            스키마에 맞는 dict
+            
+        Raises:
+            NotImplementedError: 구조화 출력을 지원하지 않는 백엔드 (호출자가
+                generate() 결과를 직접 파싱)
+        """
+        raise NotImplementedError(f"{self.name}: 구조화 JSON 출력 미지원")
+    
+    async def agenerate_json(
+        self,
+        prompt: str,
+        schema: dict,
+        system_prompt: str = "",
+        max_tokens: int = 4096,
+    ) -> dict:
+        """비동기 구조화 JSON 생성 (기본 구현은 generate_json()을 스레드에서 실행)"""
+        return await asyncio.to_thread(self.generate_json, prompt, schema, system_prompt, max_tokens)
+    
     def get_token_usage(self) -> dict:
         """토큰 사용량 반환"""
         return {
             "input_tokens": self.token_usage.input_tokens,
             "output_tokens": self.token_usage.output_tokens,
             "total_tokens": self.token_usage.total_tokens,
+            "cache_read_input_tokens": self.token_usage.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.token_usage.cache_creation_input_tokens,
         }
     
     def reset_token_usage(self):
@@ -57,3 +149,156 @@ class LLMBackend(ABC):
     def name(self) -> str:
         """백엔드 이름"""
         pass
+
+
+class CachedLLMBackend:
+    """
+    LLM 응답 캐시 믹스인 (기본 비활성 — LLM_CACHE=1로 켬)
+    
+    (model, system_prompt, prompt, max_tokens) 해시를 키로 응답을 디스크에 저장하여
+    동일한 요청의 API 재호출을 건너뜀. max_tokens 한도에서 잘린 응답은 저장하지 않음.
+    semantic_cache가 켜져 있으면 임베딩 코사인 유사도가 임계값 이상인 유사
+    프롬프트의 응답도 재사용.
+    
+    환경 변수 (인스턴스 생성 시점에 읽음):
+        LLM_CACHE=1            캐시 활성화
+        LLM_CACHE_DIR          캐시 디렉토리 (기본: .llm_cache)
+        LLM_CACHE_TTL          유효 기간 초 (기본: 7일)
+        LLM_SEMANTIC_CACHE=1   유사 프롬프트 캐시 활성화 (sentence-transformers 필요)
+    """
+    
+    SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+    SEMANTIC_THRESHOLD = 0.92
+    
+    cache_enabled: bool
+    cache_dir: Path
+    cache_ttl: float
+    semantic_cache: bool
+    
+    _embedder = None
+    _semantic_keys: Optional[list] = None
+    _semantic_matrix = None
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_enabled = os.getenv("LLM_CACHE", "0") == "1"
+        self.cache_dir = Path(os.getenv("LLM_CACHE_DIR", ".llm_cache"))
+        self.cache_ttl = float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+        self.semantic_cache = os.getenv("LLM_SEMANTIC_CACHE", "0") == "1"
+    
+    def _cache_key(self, prompt: str, system_prompt: str, max_tokens: int) -> str:
+        """캐시 키 계산 (출력 한도가 다르면 다른 요청으로 취급)"""
+        payload = json.dumps(
+            {"model": self.name, "sys": system_prompt, "prompt": prompt, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    def _cache_read(self, key: str) -> Optional[dict]:
+        """만료되지 않은 캐시 항목 로드"""
+        path = self._cache_path(key)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.cache_ttl:
+            return None
+        return entry
+    
+    def _cache_get(self, prompt: str, system_prompt: str, max_tokens: int) -> Optional[str]:
+        """캐시된 응답 조회 (없으면 None)"""
+        if not self.cache_enabled:
+            return None
+        
+        entry = self._cache_read(self._cache_key(prompt, system_prompt, max_tokens))
+        if entry is not None:
+            return entry["response"]
+        
+        if self.semantic_cache:
+            return self._semantic_get(prompt, system_prompt)
+        return None
+    
+    def _cache_set(
+        self,
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        response: str,
+        truncated: bool = False,
+    ):
+        """응답 캐시 저장 (max_tokens에서 잘린 응답은 저장하지 않음)"""
+        if not self.cache_enabled or truncated:
+            return
+        
+        key = self._cache_key(prompt, system_prompt, max_tokens)
+        entry = {"created_at": time.time(), "response": response}
+        
+        if self.semantic_cache:
+            vector = self._embed(system_prompt, prompt)
+            entry["embedding"] = vector.tolist()
+            self._semantic_add(key, vector)
+        
+        atomic_write(self._cache_path(key), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+    
+    # ── 유사 프롬프트 캐시 ──────────────────────────────────────
+    
+    def _embed(self, system_prompt: str, prompt: str):
+        """정규화된 프롬프트 임베딩"""
+        if CachedLLMBackend._embedder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise RuntimeError(
+                    "sentence-transformers 패키지가 설치되지 않았습니다.\n"
+                    "pip install sentence-transformers"
+                )
+            CachedLLMBackend._embedder = SentenceTransformer(self.SEMANTIC_MODEL)
+        return CachedLLMBackend._embedder.encode(
+            f"{self.name}\n{system_prompt}\n{prompt}",
+            normalize_embeddings=True,
+        )
+    
+    def _semantic_load(self):
+        """캐시 디렉토리의 임베딩을 하나의 행렬로 로드"""
+        import numpy as np
+        
+        keys, vectors = [], []
+        for path in self.cache_dir.glob("*.json"):
+            entry = self._cache_read(path.stem)
+            if entry and "embedding" in entry:
+                keys.append(path.stem)
+                vectors.append(entry["embedding"])
+        
+        self._semantic_keys = keys
+        self._semantic_matrix = np.asarray(vectors, dtype=np.float32) if vectors else None
+    
+    def _semantic_add(self, key: str, vector):
+        import numpy as np
+        
+        if self._semantic_keys is None:
+            self._semantic_load()
+        row = np.asarray(vector, dtype=np.float32)[None, :]
+        self._semantic_keys.append(key)
+        self._semantic_matrix = row if self._semantic_matrix is None else np.vstack([self._semantic_matrix, row])
+    
+    def _semantic_get(self, prompt: str, system_prompt: str) -> Optional[str]:
+        """코사인 유사도가 임계값 이상인 캐시 응답 조회"""
+        if self._semantic_keys is None:
+            self._semantic_load()
+        if self._semantic_matrix is None:
+            return None
+        
+        # 정규화된 벡터이므로 내적이 곧 코사인 유사도
+        scores = self._semantic_matrix @ self._embed(system_prompt, prompt)
+        best = int(scores.argmax())
+        if scores[best] < self.SEMANTIC_THRESHOLD:
+            return None
+        
+        entry = self._cache_read(self._semantic_keys[best])
+        return entry["response"] if entry else None
@@ -3,177 +3,231 @@ Mock Backends for Testing
 Test backends without external services
 """
 
+import functools
+import json
+import re
+import threading
 from io import BytesIO
-from typing import Optional, Tuple
-from PIL import Image, ImageDraw
+from typing import Final, Optional, Tuple
 
-from .llm_base import LLMBackend, TokenUsage
+from .llm_base import LLMBackend
 from .image_base import ImageBackend
 
 
-class MockLLMBackend(LLMBackend):
-    """Mock LLM backend for testing"""
-    
-    def __init__(self):
-        self._name = "mock-llm"
-        self._input_tokens = 0
-        self._output_tokens = 0
-    
-    @property
-    def name(self) -> str:
-        return self._name
-    
-    def generate(
-        self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
-        max_tokens: int = 4096,
-        temperature: float = 0.7,
-    ) -> str:
-        """Mock text generation"""
-        self._input_tokens += len(prompt.split()) * 2
-        
-        prompt_lower = prompt.lower()
-        
-        # Check for coloring book
-        if "coloring book" in prompt_lower and "page ideas" in prompt_lower:
-            response = self._generate_coloring_pages()
-        elif "coloring book" in prompt_lower and "prompt" in prompt_lower:
-            response = self._generate_coloring_prompts()
-        # Check for image prompts (more specific)
-        elif "image" in prompt_lower and ("prompt" in prompt_lower or "dall-e" in prompt_lower):
-            response = self._generate_image_prompts()
-        elif "edit" in prompt_lower and "polish" not in prompt_lower:
-            response = self._generate_edited_story()
-        elif "picture book" in prompt_lower or ("pages" in prompt_lower and "write" in prompt_lower):
-            response = self._generate_story()
-        elif "outline" in prompt_lower:
-            response = self._generate_outline()
-        elif "chapter" in prompt_lower:
-            response = self._generate_chapter(prompt)
-        else:
-            response = self._generate_generic()
-        
-        self._output_tokens += len(response.split()) * 2
-        return response
-    
-    def _generate_coloring_pages(self) -> str:
-        return '''{
-  "title": "Coloring Book for Nurses: Relaxation & Self-Care",
-  "pages": [
-    {"page": 1, "title": "Healing Hands", "description": "Intricate design of caring hands with floral patterns", "type": "pattern"},
-    {"page": 2, "title": "Stethoscope Mandala", "description": "Mandala design incorporating stethoscope and medical symbols", "type": "mandala"},
-    {"page": 3, "title": "Coffee Break", "description": "Cozy scene of coffee cup with steam swirls and pastries", "type": "scene"},
-    {"page": 4, "title": "You Are Appreciated", "description": "Inspirational quote with decorative lettering and flowers", "type": "quote"},
-    {"page": 5, "title": "Night Shift Stars", "description": "Peaceful night sky with moon and stars pattern", "type": "pattern"},
-    {"page": 6, "title": "Scrubs & Flowers", "description": "Nurse scrubs decorated with botanical flower patterns", "type": "scene"},
-    {"page": 7, "title": "Heart Monitor Art", "description": "Creative heartbeat line transforming into flowers", "type": "pattern"},
-    {"page": 8, "title": "Self-Care Sunday", "description": "Relaxing bath scene with candles and plants", "type": "scene"},
-    {"page": 9, "title": "Medical Mandala", "description": "Symmetrical mandala with pills, bandages, and hearts", "type": "mandala"},
-    {"page": 10, "title": "Heroes Wear Scrubs", "description": "Bold lettering with cape and medical symbols", "type": "quote"},
-    {"page": 11, "title": "Garden of Healing", "description": "Peaceful garden scene with medicinal herbs", "type": "scene"},
-    {"page": 12, "title": "Nurse Life Pattern", "description": "Repeating pattern of nursing items and symbols", "type": "pattern"},
-    {"page": 13, "title": "Breathe", "description": "Calming word art with flowing air and leaf designs", "type": "quote"},
-    {"page": 14, "title": "Caring Heart", "description": "Large decorative heart filled with intricate patterns", "type": "mandala"},
-    {"page": 15, "title": "Tea Time", "description": "Cozy tea set with cookies and flowers", "type": "scene"},
-    {"page": 16, "title": "Butterfly Transformation", "description": "Butterflies emerging from medical symbols", "type": "pattern"},
-    {"page": 17, "title": "You Make a Difference", "description": "Uplifting quote with sunburst design", "type": "quote"},
-    {"page": 18, "title": "Peaceful Pond", "description": "Serene water scene with lotus flowers", "type": "scene"},
-    {"page": 19, "title": "Nurse Badge Mandala", "description": "Circular design around a nurse ID badge", "type": "mandala"},
-    {"page": 20, "title": "Comfort & Care", "description": "Warm blanket pattern with hearts", "type": "pattern"},
-    {"page": 21, "title": "Sunrise Hope", "description": "Beautiful sunrise over hospital silhouette", "type": "scene"},
-    {"page": 22, "title": "Strength in Kindness", "description": "Decorative lettering with ribbon design", "type": "quote"},
-    {"page": 23, "title": "Floral Scrub Cap", "description": "Detailed scrub cap covered in flower patterns", "type": "pattern"},
-    {"page": 24, "title": "Zen Garden", "description": "Japanese zen garden with stones and raked sand", "type": "scene"},
-    {"page": 25, "title": "Heartbeat Flowers", "description": "EKG line blooming into various flowers", "type": "pattern"},
-    {"page": 26, "title": "Rest & Recharge", "description": "Cozy bedroom scene with plants and books", "type": "scene"},
-    {"page": 27, "title": "Compassion Mandala", "description": "Intricate mandala with hands and hearts", "type": "mandala"},
-    {"page": 28, "title": "One Day at a Time", "description": "Calendar page with floral decorations", "type": "quote"},
-    {"page": 29, "title": "Healing Garden", "description": "Greenhouse full of medicinal plants", "type": "scene"},
-    {"page": 30, "title": "Thank You Nurses", "description": "Celebratory design with confetti and hearts", "type": "pattern"}
-  ]
-}'''
-
-    def _generate_coloring_prompts(self) -> str:
-        return '''{
-  "cover_prompt": "Colorful illustrated book cover for nurses coloring book, warm and inviting design with stethoscope, hearts, and flowers, professional yet caring aesthetic, title space at top",
-  "pages": [
-    {"page": 1, "prompt": "Black and white line art, coloring book page, intricate design of two caring hands with detailed floral and vine patterns flowing around them, clean outlines, white background, no shading"},
-    {"page": 2, "prompt": "Black and white line art, coloring book page, mandala design with stethoscope forming the center, surrounded by medical crosses, hearts, and geometric patterns, symmetrical, white background"},
-    {"page": 3, "prompt": "Black and white line art, coloring book page, cozy coffee cup with decorative steam swirls, surrounded by pastries and small flowers, detailed line work, white background"},
-    {"page": 4, "prompt": "Black and white line art, coloring book page, decorative hand lettering saying You Are Appreciated surrounded by roses and leaves, ornate border, white background"},
-    {"page": 5, "prompt": "Black and white line art, coloring book page, night sky pattern with crescent moon, detailed stars, and swirling clouds, dreamy design, white background"},
-    {"page": 6, "prompt": "Black and white line art, coloring book page, nurse scrubs top decorated with detailed botanical flower patterns, buttons and pockets visible, white background"},
-    {"page": 7, "prompt": "Black and white line art, coloring book page, creative EKG heartbeat line that transforms into blooming flowers and vines, flowing design, white background"},
-    {"page": 8, "prompt": "Black and white line art, coloring book page, relaxing bath scene with clawfoot tub, candles, potted plants, and bubbles, peaceful atmosphere, white background"},
-    {"page": 9, "prompt": "Black and white line art, coloring book page, symmetrical mandala incorporating pills, bandages, medical crosses, and hearts in geometric pattern, white background"},
-    {"page": 10, "prompt": "Black and white line art, coloring book page, bold decorative lettering Heroes Wear Scrubs with flowing cape design and small medical symbols, white background"},
-    {"page": 11, "prompt": "Black and white line art, coloring book page, peaceful garden scene with labeled medicinal herbs like lavender, chamomile, and mint, detailed botanical style, white background"},
-    {"page": 12, "prompt": "Black and white line art, coloring book page, seamless repeating pattern of nursing items: stethoscopes, syringes, bandages, hearts, pills, white background"},
-    {"page": 13, "prompt": "Black and white line art, coloring book page, the word BREATHE in decorative lettering with flowing air swirls and delicate leaves, calming design, white background"},
-    {"page": 14, "prompt": "Black and white line art, coloring book page, large decorative heart shape filled with intricate zentangle patterns, swirls and geometric designs, white background"},
-    {"page": 15, "prompt": "Black and white line art, coloring book page, detailed tea set with teapot, cups, cookies on plate, and small flowers, cozy scene, white background"},
-    {"page": 16, "prompt": "Black and white line art, coloring book page, butterflies with detailed wing patterns emerging from and flying around medical symbols, transformation theme, white background"},
-    {"page": 17, "prompt": "Black and white line art, coloring book page, You Make a Difference in decorative script with radiating sunburst lines and small stars, white background"},
-    {"page": 18, "prompt": "Black and white line art, coloring book page, serene pond scene with detailed lotus flowers, lily pads, and gentle ripples, peaceful design, white background"},
-    {"page": 19, "prompt": "Black and white line art, coloring book page, circular mandala design with nurse ID badge at center, surrounded by symmetrical patterns and medical symbols, white background"},
-    {"page": 20, "prompt": "Black and white line art, coloring book page, cozy knitted blanket pattern with hearts and geometric designs, warm and comforting, white background"},
-    {"page": 21, "prompt": "Black and white line art, coloring book page, beautiful sunrise with detailed rays over hospital building silhouette, hopeful scene, white background"},
-    {"page": 22, "prompt": "Black and white line art, coloring book page, Strength in Kindness in elegant lettering with flowing ribbon design and small flowers, white background"},
-    {"page": 23, "prompt": "Black and white line art, coloring book page, detailed surgical scrub cap covered in various flower patterns, roses, daisies, and leaves, white background"},
-    {"page": 24, "prompt": "Black and white line art, coloring book page, Japanese zen garden with carefully placed stones, raked sand patterns, and small bridge, peaceful, white background"},
-    {"page": 25, "prompt": "Black and white line art, coloring book page, EKG heartbeat line that blooms into various detailed flowers: roses, tulips, daisies, flowing design, white background"},
-    {"page": 26, "prompt": "Black and white line art, coloring book page, cozy bedroom scene with bed, nightstand, potted plants, books, and window with curtains, restful, white background"},
-    {"page": 27, "prompt": "Black and white line art, coloring book page, intricate mandala with caring hands reaching toward center, surrounded by hearts and flowing patterns, white background"},
-    {"page": 28, "prompt": "Black and white line art, coloring book page, One Day at a Time in decorative lettering on calendar page design with floral corner decorations, white background"},
-    {"page": 29, "prompt": "Black and white line art, coloring book page, greenhouse interior full of potted medicinal plants and herbs, detailed botanical illustration style, white background"},
-    {"page": 30, "prompt": "Black and white line art, coloring book page, Thank You Nurses in celebratory lettering with confetti, hearts, stars, and ribbon decorations, white background"}
-  ]
-}'''
-    
-    def _generate_story(self) -> str:
-        return '''{
-  "title": "The Brave Little Rabbit",
-  "pages": [
-    {"page": 1, "text": "In a cozy burrow under the old oak tree, lived a small rabbit named Pip. Pip had the softest brown fur and the biggest dreams.", "emotion": "warmth", "scene": "Cozy underground burrow with warm lighting"},
-    {"page": 2, "text": "One sunny morning, Pip heard whispers about a magical garden beyond the meadow. \\"I must find it!\\" Pip exclaimed.", "emotion": "curiosity", "scene": "Rabbit at burrow entrance, looking at distant meadow"},
-    {"page": 3, "text": "The path was long and winding. Pip hopped over streams and under fallen logs. Sometimes the shadows seemed scary.", "emotion": "determination", "scene": "Rabbit hopping through forest path"},
-    {"page": 4, "text": "A wise old owl hooted from above. \\"Little one, the garden is closer than you think. Follow your heart.\\"", "emotion": "wonder", "scene": "Owl on branch talking to rabbit below"},
-    {"page": 5, "text": "Pip felt tired and almost gave up. But then, a beautiful butterfly appeared, dancing in the sunlight.", "emotion": "hope", "scene": "Tired rabbit watching colorful butterfly"},
-    {"page": 6, "text": "Following the butterfly, Pip pushed through the last bushes and gasped. The magical garden was real!", "emotion": "joy", "scene": "Rabbit discovering beautiful garden"},
-    {"page": 7, "text": "Flowers of every color swayed in the breeze. Pip had never seen anything so beautiful in all his life.", "emotion": "awe", "scene": "Wide view of magical garden with flowers"},
-    {"page": 8, "text": "Pip made friends with the garden creatures - a ladybug, a friendly frog, and a singing bluebird.", "emotion": "friendship", "scene": "Rabbit with garden animal friends"},
-    {"page": 9, "text": "As the sun began to set, Pip knew it was time to go home. But this adventure would never be forgotten.", "emotion": "bittersweet", "scene": "Sunset over garden, rabbit looking back"},
-    {"page": 10, "text": "Pip hopped back through the forest, heart full of joy. The scary shadows didn't seem so scary anymore.", "emotion": "confidence", "scene": "Rabbit confidently hopping through forest"},
-    {"page": 11, "text": "Back at the cozy burrow, Pip told everyone about the magical garden. \\"And I'll go back again!\\" Pip promised.", "emotion": "excitement", "scene": "Rabbit telling story to family in burrow"},
-    {"page": 12, "text": "That night, Pip dreamed of flowers and friends, knowing that brave hearts always find magic. The End.", "emotion": "contentment", "scene": "Sleeping rabbit with dream clouds above"}
-  ]
-}'''
-
-    def _generate_edited_story(self) -> str:
-        return self._generate_story()
-    
-    def _generate_image_prompts(self) -> str:
-        return '''{
-  "cover_prompt": "Children's book cover illustration, a cute brown rabbit standing at the entrance of a magical garden filled with colorful flowers, warm golden sunlight, soft watercolor style, whimsical and inviting, no text",
-  "pages": [
-    {"page": 1, "prompt": "Children's book illustration, cozy underground rabbit burrow with warm orange lighting, small brown rabbit with big eyes sitting on a tiny bed, roots visible on ceiling, soft watercolor style, warm and inviting atmosphere"},
-    {"page": 2, "prompt": "Children's book illustration, small brown rabbit at burrow entrance looking out at a vast sunny meadow, morning light, sense of wonder and adventure, soft watercolor style"},
-    {"page": 3, "prompt": "Children's book illustration, determined small rabbit hopping along a winding forest path, dappled sunlight through trees, fallen logs and small stream, soft watercolor style"},
-    {"page": 4, "prompt": "Children's book illustration, wise old owl with kind eyes perched on a branch, looking down at small rabbit below, magical forest atmosphere, moonlight filtering through leaves, soft watercolor style"},
-    {"page": 5, "prompt": "Children's book illustration, tired small rabbit sitting on a rock, beautiful colorful butterfly dancing in a beam of sunlight, hope and magic in the air, soft watercolor style"},
-    {"page": 6, "prompt": "Children's book illustration, small rabbit pushing through bushes discovering a magnificent magical garden, expression of pure joy and wonder, vibrant colors, soft watercolor style"},
-    {"page": 7, "prompt": "Children's book illustration, wide panoramic view of magical garden with flowers of every color, rabbit small in the scene looking around in awe, dreamy atmosphere, soft watercolor style"},
-    {"page": 8, "prompt": "Children's book illustration, rabbit surrounded by friendly garden creatures - red ladybug, green frog, blue singing bird, all smiling, friendship and joy, soft watercolor style"},
-    {"page": 9, "prompt": "Children's book illustration, beautiful sunset over magical garden, small rabbit at the edge looking back with bittersweet expression, golden and pink sky, soft watercolor style"},
-    {"page": 10, "prompt": "Children's book illustration, confident rabbit hopping through forest path, warm evening light, shadows no longer scary, sense of growth and bravery, soft watercolor style"},
-    {"page": 11, "prompt": "Children's book illustration, rabbit family gathered in cozy burrow, main rabbit telling story with animated gestures, other rabbits listening with wonder, warm lighting, soft watercolor style"},
-    {"page": 12, "prompt": "Children's book illustration, sleeping rabbit in cozy bed, dream cloud above showing flowers and friends from the adventure, peaceful and content, soft watercolor style, gentle night lighting"}
-  ]
-}'''
-    
-    def _generate_outline(self) -> str:
-        return """# Table of Contents
+# Whitespace-delimited word, matched without materializing substrings
+_WORD_RE = re.compile(r"\S+")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count: two per word"""
+    return sum(1 for _ in _WORD_RE.finditer(text)) * 2
+
+
+# Dispatch keywords, found in one case-insensitive pass. The zero-width
+# lookahead reports overlapping hits too (e.g. "prompt" inside "image
+# generation prompt"), matching the old substring checks.
+_DISPATCH_RE = re.compile(
+    r"(?=(image generation prompt|coloring book|page ideas|picture book|"
+    r"prompt|dall-e|image|edit|polish|pages|write|outline|chapter))",
+    re.IGNORECASE,
+)
+
+
+# First standalone number in a prompt (a whole whitespace-delimited token)
+_CHAPTER_NUM_RE = re.compile(r"(?<!\S)\d+(?!\S)")
+
+
+# Canned responses, expanded from compact tables once at import time
+
+_LINE_ART: Final[str] = "Black and white line art, coloring book page, "
+_PICTURE_BOOK: Final[str] = "Children's book illustration, "
+
+# (title, description, type) per coloring page
+_COLORING_PAGE_TABLE: Final[tuple] = (
+    ("Healing Hands", "Intricate design of caring hands with floral patterns", "pattern"),
+    ("Stethoscope Mandala", "Mandala design incorporating stethoscope and medical symbols", "mandala"),
+    ("Coffee Break", "Cozy scene of coffee cup with steam swirls and pastries", "scene"),
+    ("You Are Appreciated", "Inspirational quote with decorative lettering and flowers", "quote"),
+    ("Night Shift Stars", "Peaceful night sky with moon and stars pattern", "pattern"),
+    ("Scrubs & Flowers", "Nurse scrubs decorated with botanical flower patterns", "scene"),
+    ("Heart Monitor Art", "Creative heartbeat line transforming into flowers", "pattern"),
+    ("Self-Care Sunday", "Relaxing bath scene with candles and plants", "scene"),
+    ("Medical Mandala", "Symmetrical mandala with pills, bandages, and hearts", "mandala"),
+    ("Heroes Wear Scrubs", "Bold lettering with cape and medical symbols", "quote"),
+    ("Garden of Healing", "Peaceful garden scene with medicinal herbs", "scene"),
+    ("Nurse Life Pattern", "Repeating pattern of nursing items and symbols", "pattern"),
+    ("Breathe", "Calming word art with flowing air and leaf designs", "quote"),
+    ("Caring Heart", "Large decorative heart filled with intricate patterns", "mandala"),
+    ("Tea Time", "Cozy tea set with cookies and flowers", "scene"),
+    ("Butterfly Transformation", "Butterflies emerging from medical symbols", "pattern"),
+    ("You Make a Difference", "Uplifting quote with sunburst design", "quote"),
+    ("Peaceful Pond", "Serene water scene with lotus flowers", "scene"),
+    ("Nurse Badge Mandala", "Circular design around a nurse ID badge", "mandala"),
+    ("Comfort & Care", "Warm blanket pattern with hearts", "pattern"),
+    ("Sunrise Hope", "Beautiful sunrise over hospital silhouette", "scene"),
+    ("Strength in Kindness", "Decorative lettering with ribbon design", "quote"),
+    ("Floral Scrub Cap", "Detailed scrub cap covered in flower patterns", "pattern"),
+    ("Zen Garden", "Japanese zen garden with stones and raked sand", "scene"),
+    ("Heartbeat Flowers", "EKG line blooming into various flowers", "pattern"),
+    ("Rest & Recharge", "Cozy bedroom scene with plants and books", "scene"),
+    ("Compassion Mandala", "Intricate mandala with hands and hearts", "mandala"),
+    ("One Day at a Time", "Calendar page with floral decorations", "quote"),
+    ("Healing Garden", "Greenhouse full of medicinal plants", "scene"),
+    ("Thank You Nurses", "Celebratory design with confetti and hearts", "pattern"),
+)
+
+# Line-art subject per coloring page, same order as _COLORING_PAGE_TABLE
+_COLORING_PROMPT_TABLE: Final[tuple] = (
+    "intricate design of two caring hands with detailed floral and vine patterns flowing around them, clean outlines, white background, no shading",
+    "mandala design with stethoscope forming the center, surrounded by medical crosses, hearts, and geometric patterns, symmetrical, white background",
+    "cozy coffee cup with decorative steam swirls, surrounded by pastries and small flowers, detailed line work, white background",
+    "decorative hand lettering saying You Are Appreciated surrounded by roses and leaves, ornate border, white background",
+    "night sky pattern with crescent moon, detailed stars, and swirling clouds, dreamy design, white background",
+    "nurse scrubs top decorated with detailed botanical flower patterns, buttons and pockets visible, white background",
+    "creative EKG heartbeat line that transforms into blooming flowers and vines, flowing design, white background",
+    "relaxing bath scene with clawfoot tub, candles, potted plants, and bubbles, peaceful atmosphere, white background",
+    "symmetrical mandala incorporating pills, bandages, medical crosses, and hearts in geometric pattern, white background",
+    "bold decorative lettering Heroes Wear Scrubs with flowing cape design and small medical symbols, white background",
+    "peaceful garden scene with labeled medicinal herbs like lavender, chamomile, and mint, detailed botanical style, white background",
+    "seamless repeating pattern of nursing items: stethoscopes, syringes, bandages, hearts, pills, white background",
+    "the word BREATHE in decorative lettering with flowing air swirls and delicate leaves, calming design, white background",
+    "large decorative heart shape filled with intricate zentangle patterns, swirls and geometric designs, white background",
+    "detailed tea set with teapot, cups, cookies on plate, and small flowers, cozy scene, white background",
+    "butterflies with detailed wing patterns emerging from and flying around medical symbols, transformation theme, white background",
+    "You Make a Difference in decorative script with radiating sunburst lines and small stars, white background",
+    "serene pond scene with detailed lotus flowers, lily pads, and gentle ripples, peaceful design, white background",
+    "circular mandala design with nurse ID badge at center, surrounded by symmetrical patterns and medical symbols, white background",
+    "cozy knitted blanket pattern with hearts and geometric designs, warm and comforting, white background",
+    "beautiful sunrise with detailed rays over hospital building silhouette, hopeful scene, white background",
+    "Strength in Kindness in elegant lettering with flowing ribbon design and small flowers, white background",
+    "detailed surgical scrub cap covered in various flower patterns, roses, daisies, and leaves, white background",
+    "Japanese zen garden with carefully placed stones, raked sand patterns, and small bridge, peaceful, white background",
+    "EKG heartbeat line that blooms into various detailed flowers: roses, tulips, daisies, flowing design, white background",
+    "cozy bedroom scene with bed, nightstand, potted plants, books, and window with curtains, restful, white background",
+    "intricate mandala with caring hands reaching toward center, surrounded by hearts and flowing patterns, white background",
+    "One Day at a Time in decorative lettering on calendar page design with floral corner decorations, white background",
+    "greenhouse interior full of potted medicinal plants and herbs, detailed botanical illustration style, white background",
+    "Thank You Nurses in celebratory lettering with confetti, hearts, stars, and ribbon decorations, white background",
+)
+
+# (text, emotion, scene) per picture-book page
+_STORY_TABLE: Final[tuple] = (
+    (
+        "In a cozy burrow under the old oak tree, lived a small rabbit named Pip. Pip had the softest brown fur and the biggest dreams.",
+        "warmth",
+        "Cozy underground burrow with warm lighting",
+    ),
+    (
+        "One sunny morning, Pip heard whispers about a magical garden beyond the meadow. \"I must find it!\" Pip exclaimed.",
+        "curiosity",
+        "Rabbit at burrow entrance, looking at distant meadow",
+    ),
+    (
+        "The path was long and winding. Pip hopped over streams and under fallen logs. Sometimes the shadows seemed scary.",
+        "determination",
+        "Rabbit hopping through forest path",
+    ),
+    (
+        "A wise old owl hooted from above. \"Little one, the garden is closer than you think. Follow your heart.\"",
+        "wonder",
+        "Owl on branch talking to rabbit below",
+    ),
+    (
+        "Pip felt tired and almost gave up. But then, a beautiful butterfly appeared, dancing in the sunlight.",
+        "hope",
+        "Tired rabbit watching colorful butterfly",
+    ),
+    (
+        "Following the butterfly, Pip pushed through the last bushes and gasped. The magical garden was real!",
+        "joy",
+        "Rabbit discovering beautiful garden",
+    ),
+    (
+        "Flowers of every color swayed in the breeze. Pip had never seen anything so beautiful in all his life.",
+        "awe",
+        "Wide view of magical garden with flowers",
+    ),
+    (
+        "Pip made friends with the garden creatures - a ladybug, a friendly frog, and a singing bluebird.",
+        "friendship",
+        "Rabbit with garden animal friends",
+    ),
+    (
+        "As the sun began to set, Pip knew it was time to go home. But this adventure would never be forgotten.",
+        "bittersweet",
+        "Sunset over garden, rabbit looking back",
+    ),
+    (
+        "Pip hopped back through the forest, heart full of joy. The scary shadows didn't seem so scary anymore.",
+        "confidence",
+        "Rabbit confidently hopping through forest",
+    ),
+    (
+        "Back at the cozy burrow, Pip told everyone about the magical garden. \"And I'll go back again!\" Pip promised.",
+        "excitement",
+        "Rabbit telling story to family in burrow",
+    ),
+    (
+        "That night, Pip dreamed of flowers and friends, knowing that brave hearts always find magic. The End.",
+        "contentment",
+        "Sleeping rabbit with dream clouds above",
+    ),
+)
+
+# Illustration subject per picture-book page, same order as _STORY_TABLE
+_IMAGE_PROMPT_TABLE: Final[tuple] = (
+    "cozy underground rabbit burrow with warm orange lighting, small brown rabbit with big eyes sitting on a tiny bed, roots visible on ceiling, soft watercolor style, warm and inviting atmosphere",
+    "small brown rabbit at burrow entrance looking out at a vast sunny meadow, morning light, sense of wonder and adventure, soft watercolor style",
+    "determined small rabbit hopping along a winding forest path, dappled sunlight through trees, fallen logs and small stream, soft watercolor style",
+    "wise old owl with kind eyes perched on a branch, looking down at small rabbit below, magical forest atmosphere, moonlight filtering through leaves, soft watercolor style",
+    "tired small rabbit sitting on a rock, beautiful colorful butterfly dancing in a beam of sunlight, hope and magic in the air, soft watercolor style",
+    "small rabbit pushing through bushes discovering a magnificent magical garden, expression of pure joy and wonder, vibrant colors, soft watercolor style",
+    "wide panoramic view of magical garden with flowers of every color, rabbit small in the scene looking around in awe, dreamy atmosphere, soft watercolor style",
+    "rabbit surrounded by friendly garden creatures - red ladybug, green frog, blue singing bird, all smiling, friendship and joy, soft watercolor style",
+    "beautiful sunset over magical garden, small rabbit at the edge looking back with bittersweet expression, golden and pink sky, soft watercolor style",
+    "confident rabbit hopping through forest path, warm evening light, shadows no longer scary, sense of growth and bravery, soft watercolor style",
+    "rabbit family gathered in cozy burrow, main rabbit telling story with animated gestures, other rabbits listening with wonder, warm lighting, soft watercolor style",
+    "sleeping rabbit in cozy bed, dream cloud above showing flowers and friends from the adventure, peaceful and content, soft watercolor style, gentle night lighting",
+)
+
+
+def _dump(obj) -> str:
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+_COLORING_PAGES: Final[str] = _dump({
+    "title": "Coloring Book for Nurses: Relaxation & Self-Care",
+    "pages": [
+        {"page": i, "title": title, "description": desc, "type": kind}
+        for i, (title, desc, kind) in enumerate(_COLORING_PAGE_TABLE, 1)
+    ],
+})
+
+_COLORING_PROMPTS: Final[str] = _dump({
+    "cover_prompt": "Colorful illustrated book cover for nurses coloring book, warm and inviting design with stethoscope, hearts, and flowers, professional yet caring aesthetic, title space at top",
+    "pages": [
+        {"page": i, "prompt": _LINE_ART + subject}
+        for i, subject in enumerate(_COLORING_PROMPT_TABLE, 1)
+    ],
+})
+
+_STORY: Final[str] = _dump({
+    "title": "The Brave Little Rabbit",
+    "pages": [
+        {"page": i, "text": text, "emotion": emotion, "scene": scene}
+        for i, (text, emotion, scene) in enumerate(_STORY_TABLE, 1)
+    ],
+})
+
+_IMAGE_PROMPTS: Final[str] = _dump({
+    "cover_prompt": "Children's book cover illustration, a cute brown rabbit standing at the entrance of a magical garden filled with colorful flowers, warm golden sunlight, soft watercolor style, whimsical and inviting, no text",
+    "pages": [
+        {"page": i, "prompt": _PICTURE_BOOK + subject}
+        for i, subject in enumerate(_IMAGE_PROMPT_TABLE, 1)
+    ],
+})
+
+_OUTLINE: Final[str] = """# Table of Contents
 
 ## Chapter 1: Introduction
 Basic concepts of cloud computing and AWS services overview
@@ -190,14 +244,7 @@ IAM and security best practices
 ## Chapter 5: Real Projects
 Practical project implementation examples"""
 
-    def _generate_chapter(self, prompt: str) -> str:
-        chapter_num = "1"
-        for word in prompt.split():
-            if word.isdigit():
-                chapter_num = word
-                break
-        
-        return f"""# Chapter {chapter_num}: Understanding Cloud Architecture
+_CHAPTER_TEMPLATE: Final[str] = """# Chapter {chapter_num}: Understanding Cloud Architecture
 
 ## Overview
 
@@ -234,21 +281,163 @@ In this chapter, we learned the basic concepts of cloud architecture.
 In the next chapter, we will explore specific service usage methods.
 """
 
-    def _generate_generic(self) -> str:
-        return """Cloud computing is at the core of modern IT infrastructure.
+_GENERIC: Final[str] = """Cloud computing is at the core of modern IT infrastructure.
 Major cloud providers like AWS, Azure, and GCP offer various services.
 This allows companies to reduce infrastructure management burden and focus on core business."""
 
-    def get_token_usage(self) -> TokenUsage:
-        return {
-            "input_tokens": self._input_tokens,
-            "output_tokens": self._output_tokens,
-        }
+
+def _merge_coloring_book() -> str:
+    pages = json.loads(_COLORING_PAGES)
+    prompts = json.loads(_COLORING_PROMPTS)
+    return _dump({
+        "title": pages["title"],
+        "pages": pages["pages"],
+        "cover_prompt": prompts["cover_prompt"],
+        "prompts": prompts["pages"],
+    })
+
+
+_COLORING_BOOK: Final[str] = _merge_coloring_book()
+
+
+def _merge_story_book() -> str:
+    story = json.loads(_STORY)
+    prompts = json.loads(_IMAGE_PROMPTS)
+    return _dump({
+        "title": story["title"],
+        "pages": story["pages"],
+        "cover_prompt": prompts["cover_prompt"],
+        "prompts": prompts["pages"],
+    })
+
+
+_STORY_BOOK: Final[str] = _merge_story_book()
+
+# Output-token estimate per static response, keyed by identity so dynamic
+# responses (chapters) are never hashed. The constants live for the whole
+# process, so their ids stay valid.
+_OUTPUT_TOKENS: Final[dict] = {
+    id(text): _estimate_tokens(text)
+    for text in (_COLORING_PAGES, _COLORING_PROMPTS, _COLORING_BOOK, _STORY, _STORY_BOOK,
+                 _IMAGE_PROMPTS, _OUTLINE, _GENERIC)
+}
+
+# JSON responses pre-parsed once for generate_json (shared; treat as read-only)
+_PARSED: Final[dict] = {
+    id(text): json.loads(text)
+    for text in (_COLORING_PAGES, _COLORING_PROMPTS, _COLORING_BOOK, _STORY, _STORY_BOOK, _IMAGE_PROMPTS)
+}
+
+
+# Guards MockLLMBackend._usage when chapters are generated from worker threads
+_USAGE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=256)
+def _route(hits: frozenset) -> Optional[str]:
+    """Canned response for a set of dispatch keywords (None: dynamic chapter)
+    
+    The response depends only on which keywords occurred, so every distinct
+    hit-set is resolved once and later calls are a dict lookup.
+    """
+    coloring = "coloring book" in hits
+    
+    # Check for coloring book
+    if coloring and "page ideas" in hits and "image generation prompt" in hits:
+        return _COLORING_BOOK
+    if coloring and "page ideas" in hits:
+        return _COLORING_PAGES
+    if coloring and "prompt" in hits:
+        return _COLORING_PROMPTS
+    # Story and image prompts in one request
+    if "picture book" in hits and "image generation prompt" in hits:
+        return _STORY_BOOK
+    # Check for image prompts (more specific)
+    if "image" in hits and ("prompt" in hits or "dall-e" in hits):
+        return _IMAGE_PROMPTS
+    if "edit" in hits and "polish" not in hits:
+        return _STORY  # edited story: same canned text
+    if "picture book" in hits or ("pages" in hits and "write" in hits):
+        return _STORY
+    if "outline" in hits:
+        return _OUTLINE
+    if "chapter" in hits:
+        return None
+    return _GENERIC
+
+
+class MockLLMBackend(LLMBackend):
+    """Mock LLM backend for testing"""
+    
+    __slots__ = ("_name", "_usage")
+    
+    def __init__(self):
+        self._name = "mock-llm"
+        # Updated in place and returned as-is by get_token_usage (read-only for callers)
+        self._usage = {"input_tokens": 0, "output_tokens": 0}
+    
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> str:
+        """Mock text generation"""
+        input_tokens = _estimate_tokens(prompt)
+        
+        hits = {m.group(1).lower() for m in _DISPATCH_RE.finditer(prompt)}
+        if "image generation prompt" in hits:
+            hits.add("image")  # same start position, only the longer one is captured
+        
+        response = _route(frozenset(hits))
+        if response is None:
+            response = self._generate_chapter(prompt)
+        
+        tokens = _OUTPUT_TOKENS.get(id(response))
+        if tokens is None:
+            tokens = _estimate_tokens(response)
+        with _USAGE_LOCK:
+            self._usage["input_tokens"] += input_tokens
+            self._usage["output_tokens"] += tokens
+        return response
+    
+    def generate_json(
+        self,
+        prompt: str,
+        schema: dict,
+        system_prompt: str = "",
+        max_tokens: int = 4096,
+    ) -> dict:
+        """Mock structured generation: canned JSON is returned already parsed"""
+        response = self.generate(prompt, system_prompt, max_tokens)
+        parsed = _PARSED.get(id(response))
+        if parsed is not None:
+            return parsed
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            return {"raw": response}
+    
+    def _generate_chapter(self, prompt: str) -> str:
+        match = _CHAPTER_NUM_RE.search(prompt)
+        chapter_num = match.group(0) if match else "1"
+        
+        return _CHAPTER_TEMPLATE.format(chapter_num=chapter_num)
+
+    def get_token_usage(self) -> dict:
+        return self._usage
 
 
 class MockImageBackend(ImageBackend):
     """Mock image backend for testing"""
     
+    __slots__ = ("_name",)
+    
     def __init__(self):
         self._name = "mock-image"
     
@@ -258,34 +447,46 @@ class MockImageBackend(ImageBackend):
     
     def generate(self, prompt: str, size: Tuple[int, int] = (1024, 1024)) -> bytes:
         """Generate placeholder image and return as bytes"""
-        width, height = size
-        
-        # Create gradient background
-        img = Image.new("RGB", (width, height))
-        draw = ImageDraw.Draw(img)
-        
-        for y in range(height):
-            r = int(50 + (y / height) * 100)
-            g = int(80 + (y / height) * 80)
-            b = int(120 + (y / height) * 60)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-        
-        # Center text area
-        center_y = height // 2
-        draw.rectangle(
-            [(100, center_y - 100), (width - 100, center_y + 100)],
-            fill=(255, 255, 255),
-            outline=(200, 200, 200),
-        )
-        
-        # "MOCK COVER" text
-        text = "MOCK COVER"
-        text_bbox = draw.textbbox((0, 0), text)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = (width - text_width) // 2
-        draw.text((text_x, center_y - 10), text, fill=(50, 50, 50))
-        
-        # Convert to PNG bytes
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        return buffer.getvalue()
+        return _render_placeholder(*size)
+
+
+# Placeholder label
+_MOCK_COVER_TEXT: Final[str] = "MOCK COVER"
+
+
+@functools.lru_cache(maxsize=1)
+def _mock_cover_width() -> int:
+    """Label width in the default font, measured once on first render"""
+    from PIL import Image, ImageDraw
+    
+    left, _, right, _ = ImageDraw.Draw(Image.new("RGB", (1, 1))).textbbox((0, 0), _MOCK_COVER_TEXT)
+    return right - left
+
+
+@functools.lru_cache(maxsize=8)
+def _render_placeholder(width: int, height: int) -> bytes:
+    """Render the placeholder PNG (depends only on size, so memoized)"""
+    # PIL is only needed here; importing it lazily keeps MockLLMBackend-only
+    # runs and CLI startup free of the Pillow import cost
+    from PIL import Image, ImageDraw
+    
+    # Flat background (midpoint of the old blue gradient); a single fill in C
+    img = Image.new("RGB", (width, height), (100, 120, 150))
+    draw = ImageDraw.Draw(img)
+    
+    # Center text area
+    center_y = height // 2
+    draw.rectangle(
+        [(100, center_y - 100), (width - 100, center_y + 100)],
+        fill=(255, 255, 255),
+        outline=(200, 200, 200),
+    )
+    
+    # "MOCK COVER" text
+    text_x = (width - _mock_cover_width()) // 2
+    draw.text((text_x, center_y - 10), _MOCK_COVER_TEXT, fill=(50, 50, 50))
+    
+    # Convert to PNG bytes (fast deflate; cover_designer writes these as cover.png)
+    buffer = BytesIO()
+    img.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
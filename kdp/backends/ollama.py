@@ -4,10 +4,28 @@ Ollama Backend
 """
 
 import os
-import requests
+import time
+from pathlib import Path
 from typing import Optional
 
-from .llm_base import LLMBackend
+import requests
+
+from .http import create_session
+from .llm_base import CachedLLMBackend, LLMBackend
+
+
+# check_connection 결과 재사용 시간 (초). 폴링 시 서버가 꺼져 있어도 매번 타임아웃을 기다리지 않음
+CONNECTION_CHECK_TTL = 2.0
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    토큰 수 추정 (Ollama 응답에 토큰 수가 없을 때만 사용)
+    
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII 문자는 대략 1자당 1토큰으로 계산.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars)
 
 
 class OllamaConnectionError(Exception):
@@ -15,39 +33,55 @@ class OllamaConnectionError(Exception):
     pass
 
 
-class OllamaBackend(LLMBackend):
+class OllamaBackend(CachedLLMBackend, LLMBackend):
     """Ollama 백엔드 구현"""
     
     def __init__(
         self,
         model: str = "llama3.1",
         base_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_enabled: Optional[bool] = None,
     ):
         super().__init__()
         self.model = model
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self._session = create_session()
+        self._conn_cache: Optional[tuple[float, bool]] = None  # (확인 시각, 연결 여부)
+        
+        # 응답 캐시 설정 (미지정 시 LLM_CACHE / LLM_CACHE_DIR 환경 변수 기본값)
+        if cache_dir is not None:
+            self.cache_dir = Path(cache_dir)
+        if cache_enabled is not None:
+            self.cache_enabled = cache_enabled
     
     @property
     def name(self) -> str:
         return f"ollama/{self.model}"
     
-    def generate(self, prompt: str, system_prompt: str = "") -> str:
+    def generate(self, prompt: str, system_prompt: str = "", max_tokens: int = 4096) -> str:
         """Ollama API를 통한 텍스트 생성"""
+        cached = self._cache_get(prompt, system_prompt, max_tokens)
+        if cached is not None:
+            return cached
+        
         url = f"{self.base_url}/api/generate"
         
         payload = {
             "model": self.model,
             "prompt": prompt,
             "stream": False,
+            "options": {"num_predict": max_tokens},
         }
         
         if system_prompt:
             payload["system"] = system_prompt
         
         try:
-            response = requests.post(url, json=payload, timeout=300)
+            response = self._session.post(url, json=payload, timeout=300)
             response.raise_for_status()
         except requests.exceptions.ConnectionError:
+            self._conn_cache = (time.monotonic(), False)
             raise OllamaConnectionError(
                 f"Ollama 서버에 연결할 수 없습니다: {self.base_url}\n"
                 "Ollama가 실행 중인지 확인하세요: ollama serve"
@@ -59,26 +93,45 @@ class OllamaBackend(LLMBackend):
         
         data = response.json()
         
-        # 토큰 사용량 추적 (Ollama는 대략적인 추정)
-        # Ollama API는 정확한 토큰 수를 제공하지 않으므로 문자 수 기반 추정
-        input_tokens = len(prompt) // 4
-        output_tokens = len(data.get("response", "")) // 4
+        text = data.get("response", "")
+        
+        # 토큰 사용량 추적 (prompt_eval_count / eval_count가 없으면 문자 기반 추정)
+        input_tokens = data.get("prompt_eval_count") or _estimate_tokens(prompt)
+        output_tokens = data.get("eval_count") or _estimate_tokens(text)
         self.token_usage.add(input_tokens, output_tokens)
         
-        return data.get("response", "")
+        # done_reason == "length": num_predict 한도에서 잘린 응답
+        self._cache_set(prompt, system_prompt, max_tokens, text, data.get("done_reason") == "length")
+        return text
+    
+    def close(self):
+        """HTTP 세션 종료"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
     
     def check_connection(self) -> bool:
-        """Ollama 서버 연결 확인"""
+        """Ollama 서버 연결 확인 (CONNECTION_CHECK_TTL 동안 결과 재사용)"""
+        if self._conn_cache is not None and time.monotonic() - self._conn_cache[0] < CONNECTION_CHECK_TTL:
+            return self._conn_cache[1]
+        
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
+            connected = response.status_code == 200
         except:
-            return False
+            connected = False
+        
+        self._conn_cache = (time.monotonic(), connected)
+        return connected
     
     def list_models(self) -> list[str]:
         """사용 가능한 모델 목록"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             response.raise_for_status()
             data = response.json()
             return [m["name"] for m in data.get("models", [])]
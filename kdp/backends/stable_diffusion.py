@@ -4,12 +4,22 @@ Stable Diffusion Backend
 """
 
 import base64
+import hashlib
+import json
 import os
-from typing import Optional, Tuple
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import requests
 
+from .http import create_session
 from .image_base import ImageBackend
+from .llm_base import atomic_write
+
+
+# check_connection 결과 재사용 시간 (초). 폴링 시 서버가 꺼져 있어도 매번 타임아웃을 기다리지 않음
+CONNECTION_CHECK_TTL = 2.0
 
 
 class StableDiffusionError(Exception):
@@ -18,20 +28,35 @@ class StableDiffusionError(Exception):
 
 
 class StableDiffusionBackend(ImageBackend):
-    """Stable Diffusion WebUI API 백엔드"""
+    """Stable Diffusion WebUI API 백엔드
     
-    def __init__(self, base_url: Optional[str] = None):
+    IMAGE_CACHE=1이면 생성된 PNG를 요청 파라미터 해시를 키로 디스크에 캐시하여
+    같은 표지를 다시 생성하지 않음 (기본 비활성 — 요청에 seed가 없어 캐시하면 같은
+    프롬프트로 다시 뽑을 수 없음, IMAGE_CACHE_DIR로 위치 지정).
+    """
+    
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_enabled: Optional[bool] = None,
+    ):
         self.base_url = base_url or os.getenv("SD_BASE_URL", "http://localhost:7860")
+        self._session = create_session()
+        self._conn_cache: Optional[tuple[float, bool]] = None  # (확인 시각, 연결 여부)
+        self.cache_dir = Path(cache_dir or os.getenv("IMAGE_CACHE_DIR", ".image_cache"))
+        self.cache_enabled = (
+            cache_enabled if cache_enabled is not None
+            else os.getenv("IMAGE_CACHE", "0") == "1"
+        )
     
     @property
     def name(self) -> str:
         return "stable-diffusion"
     
-    def generate(self, prompt: str, size: Tuple[int, int] = (1024, 1024)) -> bytes:
-        """Stable Diffusion WebUI API를 통한 이미지 생성"""
-        url = f"{self.base_url}/sdapi/v1/txt2img"
-        
-        payload = {
+    def _payload(self, prompt: str, size: Tuple[int, int]) -> dict:
+        """txt2img 요청 파라미터"""
+        return {
             "prompt": prompt,
             "negative_prompt": "blurry, low quality, distorted, watermark, text errors",
             "width": size[0],
@@ -40,11 +65,16 @@ class StableDiffusionBackend(ImageBackend):
             "cfg_scale": 7,
             "sampler_name": "DPM++ 2M Karras",
         }
+    
+    def _txt2img(self, payload: dict) -> List[bytes]:
+        """txt2img API 호출 후 응답 이미지들을 디코딩"""
+        url = f"{self.base_url}/sdapi/v1/txt2img"
         
         try:
-            response = requests.post(url, json=payload, timeout=300)
+            response = self._session.post(url, json=payload, timeout=300)
             response.raise_for_status()
         except requests.exceptions.ConnectionError:
+            self._conn_cache = (time.monotonic(), False)
             raise StableDiffusionError(
                 f"Stable Diffusion WebUI에 연결할 수 없습니다: {self.base_url}\n"
                 "WebUI가 --api 옵션으로 실행 중인지 확인하세요."
@@ -60,13 +90,79 @@ class StableDiffusionBackend(ImageBackend):
             raise StableDiffusionError("이미지 생성 실패: 응답에 이미지가 없습니다")
         
         # Base64 디코딩
-        image_base64 = data["images"][0]
-        return base64.b64decode(image_base64)
+        return [base64.b64decode(image_base64) for image_base64 in data["images"]]
+    
+    def generate(self, prompt: str, size: Tuple[int, int] = (1024, 1024)) -> bytes:
+        """Stable Diffusion WebUI API를 통한 이미지 생성"""
+        payload = self._payload(prompt, size)
+        
+        cache_path = self._cache_path(payload)
+        if self.cache_enabled and cache_path.exists():
+            return cache_path.read_bytes()
+        
+        image = self._txt2img(payload)[0]
+        
+        if self.cache_enabled:
+            atomic_write(cache_path, image)
+        return image
+    
+    def generate_batch(self, prompts: List[str], size: Tuple[int, int] = (1024, 1024)) -> List[bytes]:
+        """
+        여러 이미지 생성
+        
+        WebUI의 batch_size는 한 요청에서 같은 프롬프트로 여러 장을 만들므로,
+        같은 프롬프트끼리 묶어 한 번의 요청으로 생성 (모델 로드·샘플러 초기화 공유).
+        한 장뿐인 프롬프트는 캐시를 쓰는 generate()로 처리.
+        """
+        positions: dict[str, list[int]] = {}
+        for idx, prompt in enumerate(prompts):
+            positions.setdefault(prompt, []).append(idx)
+        
+        images: List[Optional[bytes]] = [None] * len(prompts)
+        for prompt, indices in positions.items():
+            if len(indices) == 1:
+                images[indices[0]] = self.generate(prompt, size)
+                continue
+            
+            payload = self._payload(prompt, size)
+            payload["batch_size"] = len(indices)
+            batch = self._txt2img(payload)
+            if len(batch) < len(indices):
+                raise StableDiffusionError(
+                    f"이미지 생성 실패: {len(indices)}장 요청, {len(batch)}장 수신"
+                )
+            for idx, image in zip(indices, batch):
+                images[idx] = image
+        
+        return images
+    
+    def _cache_path(self, payload: dict) -> Path:
+        """요청 파라미터(프롬프트·크기·샘플러 등) 해시 기반 캐시 경로"""
+        key = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return self.cache_dir / f"{key}.png"
+    
+    def close(self):
+        """HTTP 세션 종료"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
     
     def check_connection(self) -> bool:
-        """Stable Diffusion WebUI 연결 확인"""
+        """Stable Diffusion WebUI 연결 확인 (CONNECTION_CHECK_TTL 동안 결과 재사용)"""
+        if self._conn_cache is not None and time.monotonic() - self._conn_cache[0] < CONNECTION_CHECK_TTL:
+            return self._conn_cache[1]
+        
         try:
-            response = requests.get(f"{self.base_url}/sdapi/v1/sd-models", timeout=5)
-            return response.status_code == 200
+            response = self._session.get(f"{self.base_url}/sdapi/v1/sd-models", timeout=5)
+            connected = response.status_code == 200
         except:
-            return False
+            connected = False
+        
+        self._conn_cache = (time.monotonic(), connected)
+        return connected
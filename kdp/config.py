@@ -3,10 +3,10 @@
 YAML 설정 파일 파싱 및 BookConfig 데이터 클래스
 """
 
+import copy
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
-import yaml
 
 
 class ConfigError(Exception):
@@ -24,13 +24,13 @@ class ConfigValidationError(ConfigError):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class CoverConfig:
     """표지 설정"""
     style: str = "modern minimalist"
 
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     """책 메타데이터"""
     description: str = ""
@@ -39,7 +39,7 @@ class Metadata:
     price: str = "9.99"
 
 
-@dataclass
+@dataclass(slots=True)
 class BookConfig:
     """책 설정 데이터 클래스"""
     id: str
@@ -61,21 +61,20 @@ class BookConfig:
         book_data = data.get("book", data)
         
         # 필수 필드 검증
-        required_fields = ["title", "author", "topic"]
-        missing = [f for f in required_fields if not book_data.get(f)]
+        missing = [f for f in ("title", "author", "topic") if not book_data.get(f)]
         if missing:
             raise ConfigValidationError(
                 f"필수 필드가 누락되었습니다: {', '.join(missing)}"
             )
         
-        # CoverConfig 파싱
-        cover_data = book_data.get("cover", {})
+        # CoverConfig 파싱 (YAML에서 빈 키로 남은 경우 None이므로 `or`로 처리)
+        cover_data = book_data.get("cover") or {}
         cover = CoverConfig(
             style=cover_data.get("style", "modern minimalist")
         )
         
         # Metadata 파싱
-        meta_data = book_data.get("metadata", {})
+        meta_data = book_data.get("metadata") or {}
         metadata = Metadata(
             description=meta_data.get("description", ""),
             keywords=meta_data.get("keywords", []),
@@ -98,8 +97,15 @@ class BookConfig:
         )
 
 
+# (절대 경로, mtime_ns, 크기) → 파싱된 BookConfig
+_CONFIG_CACHE: dict[tuple, BookConfig] = {}
+
+
 def load_config(config_path: str | Path) -> BookConfig:
-    """YAML 설정 파일 로드"""
+    """YAML 설정 파일 로드
+    
+    파일이 바뀌지 않았으면 (mtime·크기 동일) 이전 파싱 결과의 복사본을 반환.
+    """
     path = Path(config_path)
     
     if not path.exists():
@@ -107,13 +113,28 @@ def load_config(config_path: str | Path) -> BookConfig:
             f"설정 파일을 찾을 수 없습니다: {path.absolute()}"
         )
     
+    st = path.stat()
+    key = (str(path.absolute()), st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None:
+        # 호출자가 수정해도 캐시가 오염되지 않도록 복사본 반환
+        return copy.deepcopy(cached)
+    
+    # yaml은 설정 파일을 실제로 읽을 때만 import (CLI 시작 시간 단축)
+    import yaml
+    
+    # libyaml C 로더가 있으면 사용 (순수 Python SafeLoader 대비 수 배 빠름)
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    
     try:
         with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=loader)
     except yaml.YAMLError as e:
         raise ConfigValidationError(f"YAML 파싱 오류: {e}")
     
     if not data:
         raise ConfigValidationError("설정 파일이 비어있습니다")
     
-    return BookConfig.from_dict(data)
+    config = BookConfig.from_dict(data)
+    _CONFIG_CACHE[key] = config
+    return copy.deepcopy(config)
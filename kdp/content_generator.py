@@ -4,16 +4,28 @@ LLM을 사용하여 책 본문을 생성
 """
 
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable, Optional
 
 from .config import BookConfig
 from .backends import LLMBackend
 
+# 목차의 챕터 줄: 1~24 번호 + "." 또는 ")" 뒤의 제목
+# (목차 전체를 한 번에 훑도록 MULTILINE, 공백 매칭이 줄을 넘지 않게 [^\S\n] 사용)
+_CHAPTER_RE = re.compile(
+    r"^[^\S\n]*(?:[1-9]|1\d|2[0-4])[.)][^\S\n]*(.*?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
 
 class ContentGenerator:
     """책 콘텐츠 생성기"""
     
+    # 동시에 진행할 챕터 생성 요청 수 (I/O 대기 위주라 스레드로 충분)
+    MAX_WORKERS = 8
+    
     def __init__(
         self,
         llm: LLMBackend,
@@ -21,10 +33,12 @@ class ContentGenerator:
     ):
         self.llm = llm
         self.progress_callback = progress_callback or print
+        self._log_lock = threading.Lock()
     
     def _log(self, message: str):
-        """진행 상황 출력"""
-        self.progress_callback(message)
+        """진행 상황 출력 (챕터 생성 스레드 간 출력이 섞이지 않도록 직렬화)"""
+        with self._log_lock:
+            self.progress_callback(message)
     
     def generate_outline(self, config: BookConfig) -> str:
         """목차 자동 생성"""
@@ -45,21 +59,8 @@ class ContentGenerator:
     
     def parse_chapters(self, outline: str) -> list[str]:
         """목차 텍스트에서 챕터 제목 리스트 추출"""
-        chapters = []
-        
-        for line in outline.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # "1. 제목", "1) 제목", "Chapter 1" 등 다양한 패턴 매칭
-            for i in range(1, 25):
-                if line.startswith(f"{i}.") or line.startswith(f"{i})"):
-                    # 숫자와 구분자 제거
-                    title = re.sub(r"^\d+[\.\)]\s*", "", line).strip()
-                    if title:
-                        chapters.append(title)
-                    break
+        # "1. 제목", "1) 제목" 패턴 (1~24번), 줄 분할 없이 한 번의 스캔으로 추출
+        chapters = [title for title in _CHAPTER_RE.findall(outline) if title]
         
         # 챕터가 없으면 기본값
         if not chapters:
@@ -90,8 +91,19 @@ class ContentGenerator:
         content = self.llm.generate(prompt, system_prompt)
         return f"## Chapter {chapter_num}: {chapter_title}\n\n{content}"
     
-    def generate_book(self, config: BookConfig, output_dir: Path) -> str:
-        """전체 책 생성"""
+    def generate_book(
+        self,
+        config: BookConfig,
+        output_dir: Path,
+        return_content: bool = True,
+    ) -> str:
+        """
+        전체 책 생성
+        
+        챕터는 완성되는 대로 순서대로 manuscript.md에 바로 기록하여, 책 전체를
+        리스트·결합 문자열·인코딩 바이트로 동시에 들고 있지 않도록 함.
+        return_content=False면 원고 문자열을 모으지 않고 빈 문자열 반환.
+        """
         # 목차 준비
         outline = config.outline.strip()
         if not outline:
@@ -103,22 +115,33 @@ class ContentGenerator:
         self._log(f"📚 총 {total_chapters}개 챕터 생성 시작")
         
         # 책 제목
-        lines = [f"# {config.title}\n"]
+        header = f"# {config.title}\n"
+        parts = [header] if return_content else None
         
-        # 챕터별 생성
-        for idx, chapter_title in enumerate(chapters, 1):
+        # 챕터별 생성 (동시 요청, 결과는 챕터 순서대로 기록)
+        def generate(idx: int, chapter_title: str) -> str:
             self._log(f"📖 Chapter {idx}/{total_chapters} 생성 중: {chapter_title}")
-            
-            chapter_md = self.generate_chapter(config, chapter_title, idx)
-            lines.append(chapter_md)
+            return self.generate_chapter(config, chapter_title, idx)
         
-        content = "\n\n".join(lines)
-        
-        # 파일 저장
         output_dir.mkdir(parents=True, exist_ok=True)
         manuscript_path = output_dir / "manuscript.md"
-        manuscript_path.write_text(content, encoding="utf-8")
+        
+        with open(manuscript_path, "w", encoding="utf-8", buffering=65536) as f, \
+                ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, total_chapters)) as executor:
+            futures = [
+                executor.submit(generate, idx, chapter_title)
+                for idx, chapter_title in enumerate(chapters, 1)
+            ]
+            f.write(header)
+            for i, future in enumerate(futures):
+                chapter = future.result()
+                futures[i] = None  # 기록한 챕터는 future에서 놓아줌
+                f.write("\n\n")
+                f.write(chapter)
+                f.flush()
+                if parts is not None:
+                    parts.append(chapter)
         
         self._log(f"✅ 원고 저장 완료: {manuscript_path}")
         
-        return content
+        return "\n\n".join(parts) if parts is not None else ""
@@ -3,10 +3,12 @@
 API 사용량 및 비용 추적
 """
 
-import json
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Tuple
+
+from .jsonio import dumps, loads
 
 
 # 백엔드별 가격 정책 (USD per 1M tokens)
@@ -19,7 +21,7 @@ PRICING = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class CostRecord:
     """비용 기록"""
     backend: str
@@ -42,21 +44,30 @@ class CostTracker:
     def __init__(self, output_dir: Optional[Path] = None):
         self.output_dir = output_dir or Path("output")
         self.records: Dict[str, CostRecord] = {}
+        self._lock = threading.Lock()
+        # 백엔드별 토큰당 단가 (input, output) — 최초 기록 시 한 번만 조회
+        self._rates: Dict[str, Tuple[float, float]] = {}
     
     def record(self, backend_name: str, input_tokens: int, output_tokens: int):
-        """토큰 사용량 기록"""
-        if backend_name not in self.records:
-            self.records[backend_name] = CostRecord(backend=backend_name)
-        
-        record = self.records[backend_name]
-        record.input_tokens += input_tokens
-        record.output_tokens += output_tokens
+        """토큰 사용량 기록 (여러 스레드에서 호출 가능)"""
+        rates = self._rates.get(backend_name)
+        if rates is None:
+            pricing = self._get_pricing(backend_name)
+            rates = self._rates[backend_name] = (
+                pricing["input"] / 1_000_000,
+                pricing["output"] / 1_000_000,
+            )
         
-        # 비용 계산
-        pricing = self._get_pricing(backend_name)
-        input_cost = (record.input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (record.output_tokens / 1_000_000) * pricing["output"]
-        record.estimated_cost = input_cost + output_cost
+        with self._lock:
+            if backend_name not in self.records:
+                self.records[backend_name] = CostRecord(backend=backend_name)
+            
+            record = self.records[backend_name]
+            record.input_tokens += input_tokens
+            record.output_tokens += output_tokens
+            
+            # 이번 호출분 비용만 누적
+            record.estimated_cost += input_tokens * rates[0] + output_tokens * rates[1]
     
     def _get_pricing(self, backend_name: str) -> dict:
         """백엔드별 가격 정책 조회"""
@@ -87,20 +98,26 @@ class CostTracker:
         }
     
     def save_summary(self):
-        """비용 요약 저장"""
+        """비용 요약 저장
+        
+        cost_summary.json에는 마지막 세션과 누적 비용만 유지하고 (고정 크기),
+        세션별 기록은 cost_sessions.jsonl에 한 줄씩 추가.
+        """
         self.output_dir.mkdir(parents=True, exist_ok=True)
         summary_path = self.output_dir / "cost_summary.json"
         
-        # 기존 데이터 로드 및 병합
+        # 기존 누적 비용 로드
         existing = {}
         if summary_path.exists():
             try:
-                existing = json.loads(summary_path.read_text(encoding="utf-8"))
+                existing = loads(summary_path.read_bytes())
             except:
                 pass
         
         # 현재 세션 추가
         current = self.get_summary()
+        with open(self.output_dir / "cost_sessions.jsonl", "ab") as f:
+            f.write(dumps(current) + b"\n")
         
         # 누적 비용 계산
         cumulative_cost = existing.get("cumulative_cost_usd", 0.0) + current["total_cost_usd"]
@@ -110,9 +127,16 @@ class CostTracker:
             "cumulative_cost_usd": round(cumulative_cost, 6),
         }
         
-        summary_path.write_text(
-            json.dumps(data, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        summary_path.write_bytes(dumps(data, indent=True))
         
         return summary_path
+    
+    def iter_sessions(self) -> Iterator[dict]:
+        """cost_sessions.jsonl의 세션 기록을 한 줄씩 읽어 반환"""
+        sessions_path = self.output_dir / "cost_sessions.jsonl"
+        if not sessions_path.exists():
+            return
+        with open(sessions_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
@@ -3,6 +3,7 @@
 이미지 생성 백엔드를 사용하여 책 표지 생성
 """
 
+import functools
 from pathlib import Path
 from typing import Callable, Optional
 
@@ -56,11 +57,13 @@ class CoverDesigner:
     
     def build_prompt(self, config: BookConfig) -> str:
         """표지 생성 프롬프트 구성"""
-        genre = config.genre.lower()
-        style = config.cover.style
-        title = config.title
-        
-        template = self.GENRE_PROMPTS.get(genre, self.DEFAULT_TEMPLATE)
+        return self._prompt_for(config.genre, config.cover.style, config.title)
+    
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def _prompt_for(cls, genre: str, style: str, title: str) -> str:
+        """(장르, 스타일, 제목)별 프롬프트 (표지 변형 반복 호출 시 재사용)"""
+        template = cls.GENRE_PROMPTS.get(genre.lower(), cls.DEFAULT_TEMPLATE)
         base = template.format(style=style)
         
         return (
@@ -0,0 +1,33 @@
+"""
+JSON 직렬화 헬퍼
+orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 동등한 JSON을 생성
+(바이트 단위로 같다는 보장은 없음 — 예: 실수 1e-6 vs 1e-06)
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """
+    UTF-8 JSON 바이트로 직렬화
+    
+    두 경로 모두 들여쓰기 없으면 공백 없는 구분자를 쓰고, dict의 비문자열 키(int 등)는
+    문자열 키로 변환 (orjson은 OPT_NON_STR_KEYS 없이는 TypeError, 표준 json은 자동 변환).
+    결과는 동등한 JSON이지만 실수 표기 등은 다를 수 있으므로 바이트 비교에 의존하지 말 것.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    """JSON 바이트/문자열 파싱"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
@@ -3,14 +3,133 @@ PDF Assembler
 Convert markdown content and cover image to KDP-spec PDF
 """
 
+import re
+from io import BytesIO
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional, Tuple
 
 from fpdf import FPDF
+from PIL import Image
 
 from .config import BookConfig
 
 
+# Line kinds, matched once against the stripped line; match.lastindex is the
+# kind (paragraphs and blank lines are produced by _iter_blocks itself)
+_LINE_RE = re.compile(r"(```)|(# )|(## )|(### )|([-*] )")
+_FENCE, _TITLE, _CHAPTER, _SUBHEADING, _LIST_ITEM, _PARAGRAPH, _BLANK = range(1, 8)
+
+# Closing fence: any later line whose stripped text starts with ```
+_FENCE_CLOSE_RE = re.compile(r"^[^\S\n]*```", re.MULTILINE)
+
+
+def _iter_blocks(content: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (kind, text) markdown blocks in document order
+    
+    Headings and list items keep their stripped line, consecutive body lines
+    are joined with newlines into one paragraph, and code blocks and the
+    top-level title (shown on the title page) are dropped.
+    """
+    paragraph = []
+    # Walk line offsets so no list of lines is built
+    pos, end = 0, len(content)
+    while pos < end:
+        eol = content.find("\n", pos)
+        if eol < 0:
+            eol = end
+        stripped = content[pos:eol].strip()
+        pos = eol + 1
+        match = _LINE_RE.match(stripped)
+        kind = match.lastindex if match else 0
+        
+        if not kind and stripped:  # Body text, emitted per paragraph
+            paragraph.append(stripped)
+            continue
+        
+        if paragraph:
+            yield _PARAGRAPH, "\n".join(paragraph)
+            paragraph.clear()
+        
+        # Code blocks - jump straight past the closing fence line
+        if kind == _FENCE:
+            close = _FENCE_CLOSE_RE.search(content, pos)
+            if close is None:
+                break
+            eol = content.find("\n", close.end())
+            pos = end if eol < 0 else eol + 1
+            continue
+        
+        if kind == _TITLE:
+            continue
+        
+        yield (kind or _BLANK), stripped
+    
+    if paragraph:
+        yield _PARAGRAPH, "\n".join(paragraph)
+
+
+# Cover page: A4 in mm, rasterized at print resolution
+_COVER_MM = (210, 297)
+_COVER_DPI = 300
+_COVER_PX = tuple(round(mm / 25.4 * _COVER_DPI) for mm in _COVER_MM)
+_COVER_JPEG_QUALITY = 90
+
+# (family, style, size) font states used for the interior
+_BODY_FONT = ("Helvetica", "", 11)
+_CHAPTER_FONT = ("Helvetica", "B", 18)
+_SUBHEADING_FONT = ("Helvetica", "B", 13)
+
+
+def _use_font(pdf: FPDF, current: tuple, font: tuple) -> tuple:
+    """Switch font only when it differs from the current state"""
+    if font != current:
+        pdf.set_font(*font)
+    return font
+
+
+def _emit_chapter(pdf: FPDF, text: str, font: tuple) -> tuple:
+    pdf.add_page()
+    pdf.ln(25)
+    font = _use_font(pdf, font, _CHAPTER_FONT)
+    pdf.multi_cell(pdf.epw, 9, text[3:], align="C")
+    pdf.ln(12)
+    return _use_font(pdf, font, _BODY_FONT)
+
+
+def _emit_subheading(pdf: FPDF, text: str, font: tuple) -> tuple:
+    pdf.ln(4)
+    font = _use_font(pdf, font, _SUBHEADING_FONT)
+    pdf.multi_cell(pdf.epw, 6, text[4:])
+    pdf.ln(2)
+    return _use_font(pdf, font, _BODY_FONT)
+
+
+def _emit_list_item(pdf: FPDF, text: str, font: tuple) -> tuple:
+    font = _use_font(pdf, font, _BODY_FONT)
+    pdf.multi_cell(pdf.epw, 5, f"  - {text[2:]}")
+    return font
+
+
+def _emit_paragraph(pdf: FPDF, text: str, font: tuple) -> tuple:
+    """Consecutive body lines in one multi_cell (one layout pass per paragraph)"""
+    font = _use_font(pdf, font, _BODY_FONT)
+    pdf.multi_cell(pdf.epw, 5, text)
+    return font
+
+
+def _emit_blank(pdf: FPDF, text: str, font: tuple) -> tuple:
+    pdf.ln(3)
+    return font
+
+
+# Indexed by block kind (fence and title blocks are never yielded)
+_BLOCK_HANDLERS = (
+    None, None, None,
+    _emit_chapter, _emit_subheading, _emit_list_item, _emit_paragraph, _emit_blank,
+)
+
+
 class BookPDF(FPDF):
     """KDP interior PDF class"""
     
@@ -18,12 +137,19 @@ class BookPDF(FPDF):
         super().__init__()
         self.book_title = title
         self.book_author = author
-        self._past_title = False
+        # No header on the title page; begin_body() installs the real one
+        # once, so later pages need no per-page check
+        self.header = self._no_header
+    
+    def _no_header(self):
+        """Title page: no header"""
     
-    def header(self):
+    def begin_body(self):
+        """Enable the running header for pages after the title page"""
+        self.header = self._book_header
+    
+    def _book_header(self):
         """Page header"""
-        if not self._past_title:
-            return
         self.set_font("Helvetica", "", 8)
         # Use effective page width
         self.cell(self.epw, 5, self.book_title[:50], align="C")
@@ -63,49 +189,12 @@ class PDFAssembler:
         pdf.set_font("Helvetica", "", 14)
         pdf.multi_cell(pdf.epw, 8, f"by {config.author}", align="C")
         
-        pdf._past_title = True
+        pdf.begin_body()
         
         # Render content
-        in_code_block = False
-        for line in content.split("\n"):
-            stripped = line.strip()
-            
-            # Handle code blocks - skip content inside
-            if stripped.startswith("```"):
-                in_code_block = not in_code_block
-                continue
-            
-            if in_code_block:
-                continue
-            
-            if stripped.startswith("# "):
-                continue  # Top-level title shown on title page
-            
-            elif stripped.startswith("## "):  # Chapter title
-                pdf.add_page()
-                pdf.ln(25)
-                pdf.set_font("Helvetica", "B", 18)
-                pdf.multi_cell(pdf.epw, 9, stripped[3:], align="C")
-                pdf.ln(12)
-                pdf.set_font("Helvetica", "", 11)
-            
-            elif stripped.startswith("### "):  # Subheading
-                pdf.ln(4)
-                pdf.set_font("Helvetica", "B", 13)
-                pdf.multi_cell(pdf.epw, 6, stripped[4:])
-                pdf.ln(2)
-                pdf.set_font("Helvetica", "", 11)
-            
-            elif stripped.startswith("- ") or stripped.startswith("* "):  # List
-                pdf.set_font("Helvetica", "", 11)
-                pdf.multi_cell(pdf.epw, 5, f"  - {stripped[2:]}")
-            
-            elif stripped == "":  # Empty line
-                pdf.ln(3)
-            
-            else:  # Body text
-                pdf.set_font("Helvetica", "", 11)
-                pdf.multi_cell(pdf.epw, 5, stripped)
+        font = ("Helvetica", "", 14)
+        for kind, text in _iter_blocks(content):
+            font = _BLOCK_HANDLERS[kind](pdf, text, font)
         
         # Save
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -120,9 +209,17 @@ class PDFAssembler:
         """Generate cover PDF"""
         self._log("📄 Generating cover PDF...")
         
+        # Downscale to print resolution (never upscale) and embed as JPEG
+        # instead of the raw PNG pixels
+        with Image.open(cover_image_path) as img:
+            img = img.convert("RGB")
+            img.thumbnail(_COVER_PX, Image.LANCZOS)
+            buffer = BytesIO()
+            img.save(buffer, format="JPEG", quality=_COVER_JPEG_QUALITY)
+        
         pdf = FPDF()
         pdf.add_page()
-        pdf.image(str(cover_image_path), x=0, y=0, w=210, h=297)  # A4 mm
+        pdf.image(buffer, x=0, y=0, w=_COVER_MM[0], h=_COVER_MM[1])
         
         output_dir.mkdir(parents=True, exist_ok=True)
         cover_pdf_path = output_dir / "cover.pdf"
@@ -0,0 +1,129 @@
+"""
+ReportLab PDF Assembler
+Interior PDF via reportlab.platypus (one layout pass over the whole document)
+
+Enabled with PDF_ENGINE=reportlab; the fpdf2 PDFAssembler stays the default.
+"""
+
+import functools
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from .config import BookConfig
+from .pdf_assembler import (
+    PDFAssembler,
+    _CHAPTER,
+    _LIST_ITEM,
+    _PARAGRAPH,
+    _SUBHEADING,
+    _iter_blocks,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _styles() -> dict:
+    """Paragraph styles, created once (sizes mirror the fpdf2 layout)"""
+    try:
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import mm
+    except ImportError:
+        raise RuntimeError(
+            "reportlab is not installed.\n"
+            "pip install reportlab"
+        )
+    
+    body = ParagraphStyle("body", fontName="Helvetica", fontSize=11, leading=5 * mm)
+    return {
+        "title": ParagraphStyle(
+            "title", fontName="Helvetica-Bold", fontSize=20, leading=10 * mm, alignment=TA_CENTER
+        ),
+        "author": ParagraphStyle(
+            "author", fontName="Helvetica", fontSize=14, leading=8 * mm, alignment=TA_CENTER
+        ),
+        "chapter": ParagraphStyle(
+            "chapter", fontName="Helvetica-Bold", fontSize=18, leading=9 * mm, alignment=TA_CENTER
+        ),
+        "subheading": ParagraphStyle(
+            "subheading", fontName="Helvetica-Bold", fontSize=13, leading=6 * mm
+        ),
+        "body": body,
+        "list": ParagraphStyle("list", parent=body, leftIndent=6 * mm, bulletIndent=2 * mm),
+    }
+
+
+class PDFAssemblerReportlab(PDFAssembler):
+    """PDF Assembler rendering the interior with reportlab (cover PDF unchanged)"""
+    
+    def build_interior(self, config: BookConfig, content: str, output_dir: Path) -> Path:
+        """Generate interior PDF"""
+        styles = _styles()
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer
+        
+        self._log("📄 Generating interior PDF (reportlab)...")
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        interior_path = output_dir / "interior.pdf"
+        
+        page_w, page_h = A4
+        doc = SimpleDocTemplate(
+            str(interior_path),
+            pagesize=A4,
+            leftMargin=20 * mm,
+            rightMargin=20 * mm,
+            topMargin=30 * mm,
+            bottomMargin=20 * mm,
+            title=config.title,
+            author=config.author,
+        )
+        
+        # Title page
+        story = [
+            Spacer(1, 50 * mm),
+            Paragraph(escape(config.title), styles["title"]),
+            Spacer(1, 15 * mm),
+            Paragraph(escape(f"by {config.author}"), styles["author"]),
+        ]
+        
+        # Content
+        for kind, text in _iter_blocks(content):
+            if kind == _CHAPTER:
+                story += [
+                    PageBreak(),
+                    Spacer(1, 25 * mm),
+                    Paragraph(escape(text[3:]), styles["chapter"]),
+                    Spacer(1, 12 * mm),
+                ]
+            elif kind == _SUBHEADING:
+                story += [
+                    Spacer(1, 4 * mm),
+                    Paragraph(escape(text[4:]), styles["subheading"]),
+                    Spacer(1, 2 * mm),
+                ]
+            elif kind == _LIST_ITEM:
+                story.append(Paragraph(escape(text[2:]), styles["list"], bulletText="-"))
+            elif kind == _PARAGRAPH:
+                story.append(Paragraph(escape(text).replace("\n", "<br/>"), styles["body"]))
+            else:  # Empty line
+                story.append(Spacer(1, 3 * mm))
+        
+        def footer(canvas, doc):
+            canvas.saveState()
+            canvas.setFont("Helvetica", 8)
+            canvas.drawCentredString(page_w / 2, 10 * mm, str(doc.page))
+            canvas.restoreState()
+        
+        def header_and_footer(canvas, doc):
+            canvas.saveState()
+            canvas.setFont("Helvetica", 8)
+            canvas.drawCentredString(page_w / 2, page_h - 22 * mm, config.title[:50])
+            canvas.restoreState()
+            footer(canvas, doc)
+        
+        doc.build(story, onFirstPage=footer, onLaterPages=header_and_footer)
+        
+        self._log(f"✅ Interior PDF saved: {interior_path} ({doc.page} pages)")
+        
+        return interior_path
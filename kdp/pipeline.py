@@ -3,7 +3,7 @@
 전체 책 생성 파이프라인 관리
 """
 
-import json
+import os
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -11,11 +11,13 @@ from typing import Callable, Optional
 
 from .config import BookConfig, load_config
 from .backends import create_llm_backend, create_image_backend
+from .backends.llm_base import atomic_write
 from .content_generator import ContentGenerator
 from .cover_designer import CoverDesigner
 from .pdf_assembler import PDFAssembler
 from .quality_checker import QualityChecker
 from .cost_tracker import CostTracker
+from .jsonio import dumps, loads
 
 
 @dataclass
@@ -63,6 +65,8 @@ class Pipeline:
         self.output_dir: Optional[Path] = None
         self.status = PipelineStatus()
         self.cost_tracker: Optional[CostTracker] = None
+        # 마지막으로 status.json에 기록한 상태 (바뀌지 않았으면 다시 쓰지 않음)
+        self._saved_status: Optional[dict] = None
     
     def _log(self, message: str):
         """진행 상황 출력"""
@@ -74,19 +78,21 @@ class Pipeline:
         status_path = self.output_dir / "status.json"
         if status_path.exists():
             try:
-                data = json.loads(status_path.read_text(encoding="utf-8"))
+                data = loads(status_path.read_bytes())
                 return PipelineStatus.from_dict(data)
             except:
                 pass
         return PipelineStatus()
     
     def _save_status(self):
-        """상태 파일 저장"""
+        """상태 파일 저장 (단계 경계의 체크포인트, 변경이 있을 때만 원자적으로 기록)"""
+        data = self.status.to_dict()
+        if data == self._saved_status:
+            return
+        
         status_path = self.output_dir / "status.json"
-        status_path.write_text(
-            json.dumps(self.status.to_dict(), ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        atomic_write(status_path, dumps(data, indent=True))
+        self._saved_status = data
     
     def _save_manifest(self, quality_result=None):
         """매니페스트 저장"""
@@ -114,10 +120,7 @@ class Pipeline:
         }
         
         manifest_path = self.output_dir / "manifest.json"
-        manifest_path.write_text(
-            json.dumps(manifest, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        manifest_path.write_bytes(dumps(manifest, indent=True))
         return manifest_path
     
     def run(self, resume: bool = False) -> dict:
@@ -255,7 +258,15 @@ class Pipeline:
         self._log("📄 3단계: PDF 조립")
         self._log("=" * 50)
         
-        assembler = PDFAssembler(self._log)
+        # PDF_ENGINE=reportlab 이면 본문을 reportlab으로 조판 (기본: fpdf2)
+        if os.getenv("PDF_ENGINE", "fpdf") == "reportlab":
+            from .pdf_reportlab import PDFAssemblerReportlab
+            assembler = PDFAssemblerReportlab(self._log)
+        else:
+            assembler = PDFAssembler(self._log)
+        
+        # 순차 생성: fpdf2 조판은 순수 파이썬이라 스레드로 겹쳐도 GIL 때문에 이득이 없고
+        # (표지는 이미지 한 장이라 ~10ms), 프로세스 풀은 fpdf 재import 비용이 더 큼
         assembler.build_interior(self.config, content, self.output_dir)
         assembler.build_cover(cover_path, self.output_dir)
         
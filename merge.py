@@ -9,11 +9,18 @@ Usage:
 """
 
 import argparse
+import copy
+import functools
 import sys
 from pathlib import Path
 
-from kdp.pdf_assembler import PDFAssembler
-from kdp.quality_checker import QualityChecker
+
+@functools.lru_cache(maxsize=32)
+def _read_config_yaml(path: str, mtime_ns: int, size: int):
+    """Parse config.yaml (keyed by mtime/size so edits are picked up)"""
+    import yaml
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
 
 
 def load_book_config(book_dir: Path) -> dict:
@@ -32,15 +39,15 @@ def load_book_config(book_dir: Path) -> dict:
     }
     
     if config_path.exists():
-        import yaml
-        with open(config_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-            if data and "book" in data:
-                book_data = data["book"]
-                defaults["title"] = book_data.get("title", defaults["title"])
-                defaults["author"] = book_data.get("author", defaults["author"])
-                if "metadata" in book_data:
-                    defaults["metadata"].update(book_data["metadata"])
+        st = config_path.stat()
+        data = _read_config_yaml(str(config_path.resolve()), st.st_mtime_ns, st.st_size)
+        if data and "book" in data:
+            book_data = data["book"]
+            defaults["title"] = book_data.get("title", defaults["title"])
+            defaults["author"] = book_data.get("author", defaults["author"])
+            if "metadata" in book_data:
+                # Copy so callers cannot mutate the cached parse
+                defaults["metadata"].update(copy.deepcopy(book_data["metadata"]))
     
     return defaults
 
@@ -121,6 +128,10 @@ Book folder structure:
     print(f"📁 Output: {output_dir}")
     print("=" * 50)
     
+    # Imported only once inputs are validated (fpdf is slow to import)
+    from kdp.pdf_assembler import PDFAssembler
+    from kdp.quality_checker import QualityChecker
+    
     # Read manuscript
     content = manuscript_path.read_text(encoding="utf-8")
     
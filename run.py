@@ -20,8 +20,7 @@ try:
 except ImportError:
     pass
 
-from kdp.pipeline import Pipeline
-from kdp.config import ConfigError, load_config
+from kdp.config import ConfigError
 
 
 def main():
@@ -67,6 +66,9 @@ def main():
         print(f"❌ 설정 파일을 찾을 수 없습니다: {config_path}")
         sys.exit(1)
     
+    # 파이프라인(fpdf, 백엔드 등)은 인자 검증이 끝난 뒤에 import
+    from kdp.pipeline import Pipeline
+    
     try:
         # Mock 모드일 경우 설정 오버라이드
         if args.mock:
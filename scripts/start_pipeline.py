@@ -15,7 +15,6 @@ import uuid
 import sys
 
 import yaml
-import boto3
 
 
 def _load_config(path: str) -> dict:
@@ -67,6 +66,8 @@ def main():
         return
 
     # ── Step Functions 실행 ──────────────────────────────────
+    import boto3  # --dry-run 에서는 불필요하므로 여기서 import
+
     sfn = boto3.client("stepfunctions", region_name=args.region)
     sm_arn = _find_state_machine_arn(sfn, "kdp-publishing-pipeline")
 
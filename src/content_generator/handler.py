@@ -13,26 +13,81 @@ GPT-4o를 사용하여 책 콘텐츠를 자동 생성합니다.
 출력
   content_s3_key : S3에 저장된 마크다운 파일 경로
   word_count     : 생성된 단어 수
+
+배치 모드 (USE_BATCH_API=1)
+  실시간성이 필요 없는 대량 생성용. 챕터 요청을 OpenAI Batch API로 제출하고
+  (토큰 비용 50% 절감) batch_id / chapters 를 반환합니다.
+  Step Functions가 Wait → poll_handler 를 반복 호출하며, 완료되면
+  poll_handler가 원고를 조립·저장하고 위와 같은 출력에 status="completed"를 더해 반환합니다.
 """
 
+import io
+import json
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
 from openai import OpenAI
 
 S3_BUCKET = os.environ["S3_BUCKET"]
 OPENAI_SECRET_ARN = os.environ["OPENAI_SECRET_ARN"]
 
+# 동시에 진행할 챕터 생성 요청 수 (네트워크 대기 위주라 스레드로 충분)
+MAX_WORKERS = 8
+
+# 429/5xx 재시도 횟수 (SDK가 지수 백오프 적용)
+MAX_RETRIES = 4
+
+# 챕터 생성을 Batch API로 제출 (poll_handler로 결과 수집)
+USE_BATCH_API = os.environ.get("USE_BATCH_API", "0") == "1"
+
+# 목차 챕터 줄: "1. 제목" / "1) 제목" (1~24장)
+_CHAPTER_RE = re.compile(r"(?:[1-9]|1[0-9]|2[0-4])[.)]")
+
+# 단어 = 공백이 아닌 연속 문자 (str.split()과 같은 기준)
+_WORD_RE = re.compile(r"\S+")
+
+# 더 이상 진행되지 않는 배치 상태
+_BATCH_FAILED = {"failed", "expired", "cancelling", "cancelled"}
+
+
+# ── boto3 클라이언트 (웜 컨테이너에서 재사용) ─────────────────
+_s3_client = None
+
+
+def _get_s3():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+_sm_client = None
+
+
+def _get_secrets():
+    global _sm_client
+    if _sm_client is None:
+        _sm_client = boto3.client("secretsmanager")
+    return _sm_client
+
 
 # ── Secrets Manager 캐시 ──────────────────────────────────────
-_api_key_cache = None
+# 시크릿 로테이션 반영 주기 (초) — 만료 전까지는 웜 호출에서 재조회하지 않음
+SECRET_TTL = 3600
+
+_api_key_cache = None   # (api_key, 조회 시각)
 
 
 def _get_openai_key() -> str:
     global _api_key_cache
-    if _api_key_cache is None:
-        client = boto3.client("secretsmanager")
-        _api_key_cache = client.get_secret_value(SecretId=OPENAI_SECRET_ARN)["SecretString"]
-    return _api_key_cache
+    now = time.monotonic()
+    if _api_key_cache is None or now - _api_key_cache[1] >= SECRET_TTL:
+        key = _get_secrets().get_secret_value(SecretId=OPENAI_SECRET_ARN)["SecretString"]
+        _api_key_cache = (key, now)
+    return _api_key_cache[0]
 
 
 # ── 핵심 로직 ─────────────────────────────────────────────────
@@ -44,18 +99,56 @@ def lambda_handler(event, context):
     outline  = event.get("outline", "")
     language = event.get("language", "ko")
 
-    client = OpenAI(api_key=_get_openai_key())
+    client = OpenAI(api_key=_get_openai_key(), max_retries=MAX_RETRIES)
 
     # outline이 비어있으면 AI로 생성
     if not outline or outline.strip() == "":
         outline = _generate_outline(client, title, topic, language)
 
     chapters = _parse_chapters(outline)
-    content  = _generate_full_book(client, title, topic, chapters, language)
 
-    # S3 저장
+    if USE_BATCH_API:
+        batch_id = _submit_batch(client, [
+            _chapter_request(title, topic, chapter_title, idx, language)
+            for idx, chapter_title in enumerate(chapters, 1)
+        ])
+        return {"batch_id": batch_id, "chapters": chapters}
+
+    content = _generate_full_book(client, title, topic, chapters, language)
+    return _save_manuscript(book_id, content)
+
+
+def poll_handler(event, context):
+    """배치 모드: 배치 상태 확인, 완료 시 챕터 순서대로 원고 조립 후 S3 저장."""
+    book_id  = event["book_id"]
+    title    = event["title"]
+    chapters = event["chapters"]
+
+    client = OpenAI(api_key=_get_openai_key(), max_retries=MAX_RETRIES)
+    batch = client.batches.retrieve(event["batch_id"])
+
+    if batch.status in _BATCH_FAILED:
+        raise RuntimeError(f"OpenAI 배치 실패: {batch.id} ({batch.status})")
+    if batch.status != "completed":
+        return {"status": batch.status}
+
+    bodies = _read_batch_output(client.files.content(batch.output_file_id).text)
+    missing = [idx for idx in range(1, len(chapters) + 1) if idx not in bodies]
+    if missing:
+        raise RuntimeError(f"OpenAI 배치 결과 누락 챕터: {missing}")
+
+    lines = [f"# {title}\n"]
+    lines.extend(
+        _format_chapter(idx, chapter_title, bodies[idx])
+        for idx, chapter_title in enumerate(chapters, 1)
+    )
+    return {"status": "completed", **_save_manuscript(book_id, "\n\n".join(lines))}
+
+
+def _save_manuscript(book_id: str, content: str) -> dict:
+    """원고를 S3에 저장하고 Step Functions 출력 반환."""
     s3_key = f"{book_id}/content/manuscript.md"
-    boto3.client("s3").put_object(
+    _get_s3().put_object(
         Bucket=S3_BUCKET,
         Key=s3_key,
         Body=content.encode("utf-8"),
@@ -64,14 +157,24 @@ def lambda_handler(event, context):
 
     return {
         "content_s3_key": s3_key,
-        "word_count": len(content.split()),
+        "word_count": sum(1 for _ in _WORD_RE.finditer(content)),
     }
 
 
 # ── OpenAI 호출 헬퍼 ─────────────────────────────────────────
 
+def _stream_completion(client: OpenAI, **request) -> str:
+    """stream=True로 호출하여 도착하는 토큰을 바로 버퍼에 기록."""
+    buf = io.StringIO()
+    for chunk in client.chat.completions.create(stream=True, **request):
+        if chunk.choices:
+            buf.write(chunk.choices[0].delta.content or "")
+    return buf.getvalue()
+
+
 def _generate_outline(client: OpenAI, title: str, topic: str, language: str) -> str:
-    resp = client.chat.completions.create(
+    return _stream_completion(
+        client,
         model="gpt-4o",
         messages=[
             {"role": "system", "content": f"You are a professional book outliner. Always respond in {language}."},
@@ -85,39 +188,38 @@ def _generate_outline(client: OpenAI, title: str, topic: str, language: str) ->
         ],
         max_tokens=1500,
     )
-    return resp.choices[0].message.content
 
 
 def _parse_chapters(outline: str) -> list[str]:
     """목차 텍스트에서 챕터 제목 리스트 추출."""
-    chapters = []
-    for line in outline.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-        # "1. 제목", "Chapter 1", "챕터 1" 등 다양한 패턴 매칭
-        for i in range(1, 25):
-            if line.startswith(f"{i}.") or line.startswith(f"{i})"):
-                chapters.append(line.lstrip("0123456789.)# ").strip())
-                break
+    chapters = [
+        line.lstrip("0123456789.)# ").strip()
+        for line in map(str.strip, outline.split("\n"))
+        if _CHAPTER_RE.match(line)
+    ]
     return chapters if chapters else ["개론", "본론", "결론"]
 
 
 def _generate_full_book(client: OpenAI, title: str, topic: str, chapters: list[str], language: str) -> str:
-    """챕터별로 콘텐츠를 생성하여 마크다운으로 조립."""
+    """챕터별로 콘텐츠를 동시에 생성하여 챕터 순서대로 마크다운으로 조립."""
     lines = [f"# {title}\n"]
 
-    for idx, chapter_title in enumerate(chapters, 1):
-        chapter_md = _generate_chapter(client, title, topic, chapter_title, idx, language)
-        lines.append(chapter_md)
+    # OpenAI 클라이언트는 스레드 안전하므로 하나를 공유
+    with ThreadPoolExecutor(max_workers=min(len(chapters), MAX_WORKERS)) as executor:
+        futures = [
+            executor.submit(_generate_chapter, client, title, topic, chapter_title, idx, language)
+            for idx, chapter_title in enumerate(chapters, 1)
+        ]
+        lines.extend(future.result() for future in futures)
 
     return "\n\n".join(lines)
 
 
-def _generate_chapter(client: OpenAI, title: str, topic: str, chapter_title: str, num: int, language: str) -> str:
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
+def _chapter_request(title: str, topic: str, chapter_title: str, num: int, language: str) -> dict:
+    """챕터 생성 chat.completions 요청 본문 (실시간 호출과 배치 JSONL 공용)."""
+    return {
+        "model": "gpt-4o",
+        "messages": [
             {
                 "role": "system",
                 "content": (
@@ -136,7 +238,54 @@ def _generate_chapter(client: OpenAI, title: str, topic: str, chapter_title: str
                 ),
             },
         ],
-        max_tokens=3000,
-    )
-    body = resp.choices[0].message.content
+        "max_tokens": 3000,
+    }
+
+
+def _format_chapter(num: int, chapter_title: str, body: str) -> str:
     return f"## Chapter {num}: {chapter_title}\n\n{body}"
+
+
+def _generate_chapter(client: OpenAI, title: str, topic: str, chapter_title: str, num: int, language: str) -> str:
+    body = _stream_completion(client, **_chapter_request(title, topic, chapter_title, num, language))
+    return _format_chapter(num, chapter_title, body)
+
+
+# ── Batch API 헬퍼 ───────────────────────────────────────────
+
+def _submit_batch(client: OpenAI, requests: list[dict]) -> str:
+    """챕터 요청들을 JSONL 하나로 업로드하고 배치 작업 생성, batch_id 반환."""
+    jsonl = "".join(
+        json.dumps({
+            "custom_id": f"chapter-{idx}",
+            "method":    "POST",
+            "url":       "/v1/chat/completions",
+            "body":      body,
+        }, ensure_ascii=False) + "\n"
+        for idx, body in enumerate(requests, 1)
+    )
+    batch_file = client.files.create(
+        file=("chapters.jsonl", jsonl.encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def _read_batch_output(output: str) -> dict[int, str]:
+    """배치 결과 JSONL → {챕터 번호: 본문} (실패한 요청은 제외)."""
+    bodies = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            continue
+        idx = int(item["custom_id"].rsplit("-", 1)[1])
+        bodies[idx] = response["body"]["choices"][0]["message"]["content"]
+    return bodies
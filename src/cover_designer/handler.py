@@ -13,23 +13,73 @@ DALL-E 3를 사용하여 책 표지 이미지를 생성합니다.
   cover_s3_key : S3에 저장된 표지 PNG 경로
 """
 
+import functools
 import os
+import time
 import requests
 import boto3
+from boto3.s3.transfer import TransferConfig
 from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 S3_BUCKET = os.environ["S3_BUCKET"]
 OPENAI_SECRET_ARN = os.environ["OPENAI_SECRET_ARN"]
 
-_api_key_cache = None
+
+# ── boto3 클라이언트 (웜 컨테이너에서 재사용) ─────────────────
+_s3_client = None
+
+
+def _get_s3():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+# CDN 응답을 순차로 읽어 바로 S3에 기록 (raw 스트림은 한 스레드에서만 읽음)
+_STREAM_TRANSFER_CONFIG = TransferConfig(use_threads=False, multipart_threshold=5 * 1024 * 1024)
+
+_http_session = None
+
+
+def _get_http() -> requests.Session:
+    """DALL-E CDN 다운로드용 keep-alive 세션 (429/5xx 백오프 재시도)."""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        _http_session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]),
+        ))
+    return _http_session
+
+
+_sm_client = None
+
+
+def _get_secrets():
+    global _sm_client
+    if _sm_client is None:
+        _sm_client = boto3.client("secretsmanager")
+    return _sm_client
+
+
+# 시크릿 로테이션 반영 주기 (초) — 만료 전까지는 웜 호출에서 재조회하지 않음
+SECRET_TTL = 3600
+
+_api_key_cache = None   # (api_key, 조회 시각)
 
 
 def _get_openai_key() -> str:
     global _api_key_cache
-    if _api_key_cache is None:
-        client = boto3.client("secretsmanager")
-        _api_key_cache = client.get_secret_value(SecretId=OPENAI_SECRET_ARN)["SecretString"]
-    return _api_key_cache
+    now = time.monotonic()
+    if _api_key_cache is None or now - _api_key_cache[1] >= SECRET_TTL:
+        key = _get_secrets().get_secret_value(SecretId=OPENAI_SECRET_ARN)["SecretString"]
+        _api_key_cache = (key, now)
+    return _api_key_cache[0]
 
 
 # ── 장르별 프롬프트 템플릿 ─────────────────────────────────────
@@ -63,9 +113,14 @@ DEFAULT_TEMPLATE = (
 )
 
 
+@functools.lru_cache(maxsize=64)
+def _build_template(genre: str, style: str) -> str:
+    """장르·스타일 부분 (책마다 바뀌는 제목은 제외하여 캐시 적중)."""
+    return GENRE_PROMPTS.get(genre.lower(), DEFAULT_TEMPLATE).format(style=style)
+
+
 def _build_prompt(title: str, genre: str, style: str) -> str:
-    template = GENRE_PROMPTS.get(genre.lower(), DEFAULT_TEMPLATE)
-    base = template.format(style=style)
+    base = _build_template(genre, style)
     # 제목을 프롬프트에 포함 (DALL-E 텍스트 렌더링은 불안정하여 최선의 시도)
     return (
         f"{base}"
@@ -96,16 +151,17 @@ def lambda_handler(event, context):
     )
     image_url = response.data[0].url
 
-    # URL에서 이미지 바이트 다운로드
-    img_bytes = requests.get(image_url, timeout=30).content
-
-    # S3 저장
+    # URL 응답 본문을 메모리에 모으지 않고 S3로 바로 스트리밍
     s3_key = f"{book_id}/cover/cover.png"
-    boto3.client("s3").put_object(
-        Bucket=S3_BUCKET,
-        Key=s3_key,
-        Body=img_bytes,
-        ContentType="image/png",
-    )
+    with _get_http().get(image_url, stream=True, timeout=30) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True   # Content-Encoding 적용된 본문
+        _get_s3().upload_fileobj(
+            resp.raw,
+            Bucket=S3_BUCKET,
+            Key=s3_key,
+            ExtraArgs={"ContentType": "image/png"},
+            Config=_STREAM_TRANSFER_CONFIG,
+        )
 
     return {"cover_s3_key": s3_key}
@@ -27,10 +27,26 @@ from datetime import datetime, timezone
 
 import boto3
 
+try:
+    import orjson                      # 선택 의존성 (DepsLayer) — 없으면 표준 json
+except ImportError:
+    orjson = None
+
 S3_BUCKET    = os.environ["S3_BUCKET"]
 UPLOAD_MODE  = os.environ.get("UPLOAD_MODE", "MANIFEST_ONLY")   # MANIFEST_ONLY | SP_API
 
 
+# ── boto3 클라이언트 (웜 컨테이너에서 재사용) ─────────────────
+_s3_client = None
+
+
+def _get_s3():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
 def lambda_handler(event, context):
     book_id           = event["book_id"]
     title             = event["title"]
@@ -38,11 +54,10 @@ def lambda_handler(event, context):
     pdf_s3_key        = event["pdf_s3_key"]
     cover_pdf_s3_key  = event["cover_pdf_s3_key"]
 
-    s3 = boto3.client("s3")
+    s3 = _get_s3()
 
     # ── 파일 존재 검증 ──────────────────────────────────────
-    _validate_s3_object(s3, pdf_s3_key)
-    _validate_s3_object(s3, cover_pdf_s3_key)
+    _validate_s3_objects(s3, [pdf_s3_key, cover_pdf_s3_key])
 
     # ── 매니페스트 구성 ─────────────────────────────────────
     manifest = {
@@ -77,7 +92,7 @@ def lambda_handler(event, context):
     s3.put_object(
         Bucket=S3_BUCKET,
         Key=manifest_s3_key,
-        Body=json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+        Body=_dumps(manifest),
         ContentType="application/json",
     )
 
@@ -88,8 +103,35 @@ def lambda_handler(event, context):
     }
 
 
+def _dumps(obj) -> bytes:
+    """들여쓰기 2칸 UTF-8 JSON 바이트."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 # ── 검증 ──────────────────────────────────────────────────────
 
+def _validate_s3_objects(s3_client, keys: list[str]):
+    """S3 객체들이 모두 존재하는지 공통 prefix 목록 조회 한 번으로 확인."""
+    prefix = os.path.commonprefix(keys)
+    prefix = prefix[:prefix.rfind("/") + 1]      # 디렉터리 단위로 자름
+    if not prefix:
+        for key in keys:
+            _validate_s3_object(s3_client, key)
+        return
+
+    resp     = s3_client.list_objects_v2(Bucket=S3_BUCKET, Prefix=prefix)
+    existing = {obj["Key"] for obj in resp.get("Contents", [])}
+    for key in keys:
+        if key in existing:
+            continue
+        if resp.get("IsTruncated"):               # 목록이 잘린 경우만 개별 확인
+            _validate_s3_object(s3_client, key)
+        else:
+            raise ValueError(f"S3 객체를 찾을 수 없습니다: s3://{S3_BUCKET}/{key}")
+
+
 def _validate_s3_object(s3_client, key: str):
     """S3 객체가 존재하는지 확인. 없으면 예외 발생."""
     try:
@@ -16,38 +16,79 @@ Lambda — PDF Assembler
   interior_pages   : 본문 페이지 수
 
 한국어 폰트
-  Noto Sans KR .otf를 /tmp에 캐싱하여 사용합니다.
+  Noto Sans KR .otf를 Fonts 레이어(/opt/fonts)에서 읽습니다.
+  레이어가 없는 로컬 환경에서는 /tmp에 내려받아 캐싱합니다.
   빈 환경이면 폴백으로 Helvetica(영어만)로 렌더링됩니다.
 """
 
+import functools
+import io
 import os
 import tempfile
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from fpdf import FPDF
 
 S3_BUCKET = os.environ["S3_BUCKET"]
 
+
+# ── boto3 클라이언트 (웜 컨테이너에서 재사용) ─────────────────
+_s3_client = None
+
+
+def _get_s3():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+# 8MB 초과 PDF는 멀티파트 병렬 업로드
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+)
+_PDF_EXTRA_ARGS = {"ContentType": "application/pdf"}
+
+
 # ── 폴트 경로 및 캐시 ─────────────────────────────────────────
 FONT_NAME = "NotoKR"
-FONT_URL  = "https://github.com/nicholasng1998/Noto-Sans-CJK-KR/raw/master/NotoSansCJKkr-Regular.otf"
+FONT_FILE = "NotoSansCJKkr-Regular.otf"
+FONT_URL  = f"https://github.com/nicholasng1998/Noto-Sans-CJK-KR/raw/master/{FONT_FILE}"
+
+# Fonts 레이어 설치 경로 (src/fonts/fonts.txt → /opt/fonts)
+LAYER_FONT_PATH = os.path.join("/opt", "fonts", FONT_FILE)
 
 
+@functools.lru_cache(maxsize=1)
 def _font_path() -> str:
-    return os.path.join(tempfile.gettempdir(), "NotoSansCJKkr-Regular.otf")
+    """폰트 위치는 컨테이너 수명 동안 바뀌지 않으므로 한 번만 확인."""
+    if os.path.exists(LAYER_FONT_PATH):
+        return LAYER_FONT_PATH
+    return os.path.join(tempfile.gettempdir(), FONT_FILE)
+
+
+_font_ready = False   # 웜 컨테이너에서는 파일 확인 생략
 
 
 def _ensure_font() -> bool:
     """한국어 폰트 파일을 temp 디렉토리에 캐시하여 가져옴. 실패시 False 반환."""
-    path = _font_path()
-    if os.path.exists(path):
-        return True
-    try:
-        urllib.request.urlretrieve(FONT_URL, path)
+    global _font_ready
+    if _font_ready:
         return True
-    except Exception:
-        return False
+    path = _font_path()
+    if not os.path.exists(path):
+        try:
+            urllib.request.urlretrieve(FONT_URL, path)
+        except Exception:
+            return False          # 다음 호출에서 다시 시도
+    _font_ready = True
+    return True
 
 
 # ── 커스턴 PDF 클래스 ─────────────────────────────────────────
@@ -95,37 +136,39 @@ def lambda_handler(event, context):
     content_s3_key = event["content_s3_key"]
     cover_s3_key   = event["cover_s3_key"]
 
-    s3 = boto3.client("s3")
+    s3 = _get_s3()
 
-    # S3에서 콘텐츠와 표지 다운로드
-    content_md = s3.get_object(Bucket=S3_BUCKET, Key=content_s3_key)["Body"].read().decode("utf-8")
-    cover_bytes = s3.get_object(Bucket=S3_BUCKET, Key=cover_s3_key)["Body"].read()
-
-    tmpdir         = tempfile.gettempdir()
-    cover_img_path = os.path.join(tmpdir, "cover.png")
-    with open(cover_img_path, "wb") as f:
-        f.write(cover_bytes)
+    # S3에서 콘텐츠와 표지 동시 다운로드
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        content_future = executor.submit(_read_object, s3, content_s3_key)
+        cover_future   = executor.submit(_read_object, s3, cover_s3_key)
+        content_md  = content_future.result().decode("utf-8")
+        cover_bytes = cover_future.result()
 
     use_kr = _ensure_font()
 
-    # ── 본문 PDF ──────────────────────────────────────────────
-    interior      = _build_interior(title, author, content_md, use_kr)
-    interior_path = os.path.join(tmpdir, "interior.pdf")
-    interior.output(interior_path)
+    # ── 본문 PDF ── (/tmp를 거치지 않고 메모리에서 바로 업로드)
+    interior     = _build_interior(title, author, content_md, use_kr)
+    interior_pdf = interior.output()
 
     # ── 표지 PDF ──────────────────────────────────────────────
-    cover_pdf      = _build_cover(cover_img_path)
-    cover_pdf_path = os.path.join(tmpdir, "cover.pdf")
-    cover_pdf.output(cover_pdf_path)
+    cover_pdf = _build_cover(io.BytesIO(cover_bytes)).output()
 
     # S3 업로드
     pdf_s3_key       = f"{book_id}/output/interior.pdf"
     cover_pdf_s3_key = f"{book_id}/output/cover.pdf"
 
-    with open(interior_path, "rb") as f:
-        s3.put_object(Bucket=S3_BUCKET, Key=pdf_s3_key, Body=f, ContentType="application/pdf")
-    with open(cover_pdf_path, "rb") as f:
-        s3.put_object(Bucket=S3_BUCKET, Key=cover_pdf_s3_key, Body=f, ContentType="application/pdf")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        uploads = [
+            executor.submit(
+                s3.upload_fileobj,
+                io.BytesIO(data), Bucket=S3_BUCKET, Key=key,
+                ExtraArgs=_PDF_EXTRA_ARGS, Config=_TRANSFER_CONFIG,
+            )
+            for data, key in ((interior_pdf, pdf_s3_key), (cover_pdf, cover_pdf_s3_key))
+        ]
+        for upload in uploads:
+            upload.result()   # 업로드 실패 시 예외 전파
 
     return {
         "pdf_s3_key":       pdf_s3_key,
@@ -134,6 +177,10 @@ def lambda_handler(event, context):
     }
 
 
+def _read_object(s3, key: str) -> bytes:
+    return s3.get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+
+
 # ── PDF 빌더 ─────────────────────────────────────────────────
 
 def _build_interior(title: str, author: str, content_md: str, use_kr: bool) -> BookPDF:
@@ -147,55 +194,105 @@ def _build_interior(title: str, author: str, content_md: str, use_kr: bool) -> B
     pdf.multi_cell(0, 11, title, align="C")
     pdf.ln(16)
     pdf._set("", 15)
-    pdf.multi_cell(0, 9, f"by {author}", align="C")
+    pdf.multi_cell(0, 9, f"by {author}", align="C", new_x="LMARGIN", new_y="NEXT")
 
     pdf._past_title = True   # 이후 페이지부터 헤더 활성화
 
     # ── 본문 렌더링 (간단한 Markdown → PDF) ────────────────
+    body = []   # 연속된 본문 줄 — 문단 단위로 multi_cell 한 번에 출력
+
     for line in content_md.split("\n"):
         stripped = line.strip()
 
-        if stripped.startswith("# "):
-            continue                          # 최상위 제목은 타이틀 페이지에 이미 표시됨
-
-        elif stripped.startswith("## "):      # ── 챕터 제목
-            pdf.add_page()
-            pdf.ln(28)
-            pdf._set("B", 20)
-            pdf.multi_cell(0, 10, stripped[3:], align="C")
-            pdf.ln(14)
-            pdf._set("", 11)
-
-        elif stripped.startswith("### "):     # ── 소제목
-            pdf.ln(5)
-            pdf._set("B", 14)
-            pdf.multi_cell(0, 7, stripped[4:])
-            pdf.ln(2)
-            pdf._set("", 11)
-
-        elif stripped.startswith("- ") or stripped.startswith("* "):  # ── 리스트
-            pdf._set("", 11)
-            bullet = "-" if not pdf._kr else "\u2022"
-            pdf.multi_cell(0, 5, f"    {bullet} {stripped[2:]}")
-
-        elif stripped.startswith("**") and stripped.endswith("**"):   # ── 볼드 라인
-            pdf._set("B", 11)
-            pdf.multi_cell(0, 5, stripped.strip("*"))
-            pdf._set("", 11)
-
-        elif stripped == "":                  # ── 빈 줄
-            pdf.ln(3)
-
-        else:                                 # ── 본문
-            pdf._set("", 11)
-            pdf.multi_cell(0, 5, stripped)
-
+        emit = _line_handler(stripped)
+        if emit is None:
+            if not stripped:
+                emit = _emit_blank
+            elif _is_bold_line(stripped):
+                emit = _emit_bold
+            else:
+                body.append(stripped)         # ── 본문 (문단 끝에서 출력)
+                continue
+        _flush_body(pdf, body)
+        emit(pdf, stripped)
+
+    _flush_body(pdf, body)
     return pdf
 
 
-def _build_cover(cover_image_path: str) -> FPDF:
-    """표지 이미지를 A4 전체로 채우는 PDF."""
+# ── 마크다운 줄 렌더러 ───────────────────────────────────────
+
+def _skip(pdf: BookPDF, stripped: str):
+    """최상위 제목은 타이틀 페이지에 이미 표시됨."""
+
+
+def _emit_chapter(pdf: BookPDF, stripped: str):
+    pdf.add_page()
+    pdf.ln(28)
+    pdf._set("B", 20)
+    pdf.multi_cell(0, 10, stripped[3:], align="C")
+    pdf.ln(14)
+    pdf._set("", 11)
+
+
+def _emit_subheading(pdf: BookPDF, stripped: str):
+    pdf.ln(5)
+    pdf._set("B", 14)
+    pdf.multi_cell(0, 7, stripped[4:])
+    pdf.ln(2)
+    pdf._set("", 11)
+
+
+def _emit_list_item(pdf: BookPDF, stripped: str):
+    pdf._set("", 11)
+    bullet = "-" if not pdf._kr else "\u2022"
+    pdf.multi_cell(0, 5, f"    {bullet} {stripped[2:]}", new_x="LMARGIN", new_y="NEXT")
+
+
+def _emit_bold(pdf: BookPDF, stripped: str):
+    pdf._set("B", 11)
+    pdf.multi_cell(0, 5, stripped.strip("*"), new_x="LMARGIN", new_y="NEXT")
+    pdf._set("", 11)
+
+
+def _emit_blank(pdf: BookPDF, stripped: str):
+    pdf.ln(3)
+
+
+# 줄 접두어 → 렌더러 (접두어 길이 4 → 3 → 2 순으로 조회)
+_LINE_HANDLERS = {
+    "### ": _emit_subheading,
+    "## ":  _emit_chapter,
+    "# ":   _skip,
+    "- ":   _emit_list_item,
+    "* ":   _emit_list_item,
+}
+
+
+def _line_handler(stripped: str):
+    return (
+        _LINE_HANDLERS.get(stripped[:4])
+        or _LINE_HANDLERS.get(stripped[:3])
+        or _LINE_HANDLERS.get(stripped[:2])
+    )
+
+
+def _is_bold_line(stripped: str) -> bool:
+    return stripped.startswith("**") and stripped.endswith("**")
+
+
+def _flush_body(pdf: BookPDF, body: list[str]):
+    """모아 둔 본문 줄을 한 문단으로 출력 (줄바꿈 유지, 폰트 설정 1회)."""
+    if not body:
+        return
+    pdf._set("", 11)
+    pdf.multi_cell(0, 5, "\n".join(body), new_x="LMARGIN", new_y="NEXT")
+    body.clear()
+
+
+def _build_cover(cover_image) -> FPDF:
+    """표지 이미지(경로 또는 파일 객체)를 A4 전체로 채우는 PDF."""
     pdf = FPDF()
     pdf.add_page()
-    pdf.image(cover_image_path, x=0, y=0, w=210, h=297)  # A4 mm
+    pdf.image(cover_image, x=0, y=0, w=210, h=297)  # A4 mm
     return pdf
@@ -11,6 +11,7 @@ Usage:
 """
 
 import argparse
+import asyncio
 import json
 import sys
 from pathlib import Path
@@ -24,6 +25,37 @@ except ImportError:
     pass
 
 from kdp.backends import create_llm_backend
+from kdp.jsonio import dumps
+
+
+# Drafts longer than this are planned once, then written one page per request
+PAGE_FANOUT_THRESHOLD = 10
+
+# Maximum number of in-flight per-page draft requests
+PAGE_CONCURRENCY = 10
+
+# Shared decoder for _parse_json (stateless, safe to reuse)
+_DECODER = json.JSONDecoder()
+
+# Per-page field -> column name in the compact prompt form
+_PAGE_COLUMNS = {"page": "page_numbers", "text": "texts", "emotion": "emotions", "scene": "scenes"}
+
+
+def _prompt_json(obj) -> str:
+    """Compact JSON for embedding in a prompt (no indentation whitespace)"""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _columns(story: dict) -> dict:
+    """Story as parallel per-field arrays, so page keys aren't repeated per page"""
+    pages = story.get("pages")
+    if not isinstance(pages, list):
+        return story
+    data = {k: v for k, v in story.items() if k != "pages"}
+    pages = [page for page in pages if isinstance(page, dict)]
+    for field, column in _PAGE_COLUMNS.items():
+        data[column] = [page.get(field) for page in pages]
+    return data
 
 
 @dataclass
@@ -46,6 +78,9 @@ class StoryWriter:
     
     def stage1_draft(self, config: StoryConfig) -> list[dict]:
         """Stage 1: Draft - Focus on variety and emotion"""
+        if config.pages > PAGE_FANOUT_THRESHOLD:
+            return asyncio.run(self._draft_by_page(config))
+        
         self.log("📝 Stage 1: Creating draft (variety & emotion)...")
         
         prompt = f"""You are a children's book author. Write a {config.pages}-page picture book story.
@@ -73,6 +108,67 @@ Output as JSON:
         response = self.llm.generate(prompt, max_tokens=4000)
         return self._parse_json(response)
     
+    async def _draft_by_page(self, config: StoryConfig) -> dict:
+        """Stage 1 for long books: plan the story arc, then write every page concurrently
+        
+        Each page reply stays small, so long books no longer overflow a
+        single response's max_tokens.
+        """
+        self.log(f"📝 Stage 1: Planning {config.pages}-page story arc...")
+        
+        plan_prompt = f"""You are a children's book author. Plan a {config.pages}-page picture book story.
+
+Topic: {config.topic}
+Target Age: {config.target_age}
+Style: {config.style}
+
+Requirements:
+- Build tension and resolution across the pages
+- Include emotional moments (joy, surprise, worry, relief, triumph)
+- Give every page a vivid, imaginable scene
+
+Output as JSON:
+{{
+  "title": "Story Title",
+  "pages": [
+    {{"page": 1, "emotion": "curiosity", "scene": "Brief scene description"}},
+    ...
+  ]
+}}"""
+        
+        plan = self._parse_json(await self.llm.agenerate(plan_prompt, max_tokens=2000))
+        beats = [beat for beat in plan.get("pages", []) if isinstance(beat, dict)]
+        if not beats:
+            return plan
+        
+        self.log(f"📝 Stage 1: Writing {len(beats)} pages concurrently...")
+        semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+        story_plan = _prompt_json(beats)
+        
+        async def write(num: int, beat: dict) -> dict:
+            prompt = f"""You are a children's book author writing page {num} of {len(beats)} of the picture book "{plan.get("title", config.topic)}".
+
+Target Age: {config.target_age}
+Style: {config.style}
+Story plan: {story_plan}
+
+Write only page {num}: 2-4 sentences, varied sentence structures (short, long, questions,
+exclamations), matching its planned emotion and scene.
+
+Output as JSON:
+{{"page": {num}, "text": "Page text..."}}"""
+            async with semaphore:
+                return self._parse_json(await self.llm.agenerate(prompt, max_tokens=500))
+        
+        texts = await asyncio.gather(*[write(num, beat) for num, beat in enumerate(beats, 1)])
+        return {
+            "title": plan.get("title", ""),
+            "pages": [
+                {**beat, "page": beat.get("page", num), "text": text.get("text") or text.get("raw") or beat.get("text", "")}
+                for num, (beat, text) in enumerate(zip(beats, texts), 1)
+            ],
+        }
+    
     def stage2_first_edit(self, draft: dict) -> dict:
         """Stage 2: First Edit - Grammar and flow"""
         self.log("✏️ Stage 2: First edit (grammar & flow)...")
@@ -80,7 +176,7 @@ Output as JSON:
         prompt = f"""You are a professional editor. Edit this children's book for grammar and flow.
 
 Current draft:
-{json.dumps(draft, indent=2, ensure_ascii=False)}
+{_prompt_json(draft)}
 
 Edit for:
 1. Fix any grammar issues
@@ -101,7 +197,7 @@ Return the edited version in the same JSON format."""
         prompt = f"""You are a senior publishing editor. Do a final polish on this children's book.
 
 Current version:
-{json.dumps(edited, indent=2, ensure_ascii=False)}
+{_prompt_json(edited)}
 
 Final polish for:
 1. Professional publishing quality
@@ -122,8 +218,8 @@ Return the final version in the same JSON format."""
         
         prompt = f"""Create detailed image generation prompts for each page of this children's book.
 
-Story:
-{json.dumps(story, indent=2, ensure_ascii=False)}
+Story (one array entry per page, same order in every array):
+{_prompt_json(_columns(story))}
 
 For each page, create a DALL-E/ChatGPT image prompt that:
 - Describes the scene in vivid detail
@@ -144,14 +240,58 @@ Output as JSON:
         response = self.llm.generate(prompt, max_tokens=4000)
         return self._parse_json(response)
     
+    def generate_combined(self, config: StoryConfig) -> dict:
+        """Draft, both edits and image prompts in a single LLM call
+        
+        The revision passes happen inside one request, so the story JSON is
+        never re-sent as input and only the final version is returned.
+        """
+        self.log("📝 Writing story: draft → first edit → final edit → image prompts (single pass)...")
+        
+        prompt = f"""You are a children's book author and senior publishing editor. Write a {config.pages}-page picture book story.
+
+Topic: {config.topic}
+Target Age: {config.target_age}
+Style: {config.style}
+
+Work in three passes before answering:
+1. Draft - Each page: 2-4 sentences (suitable for picture book); varied sentence structures
+   (short, long, questions, exclamations); emotional moments (joy, surprise, worry, relief,
+   triumph); vivid, imaginable scenes; build tension and resolution.
+2. First edit - Fix grammar, improve flow and rhythm, smooth transitions between pages,
+   age-appropriate language, keep the emotional beats intact.
+3. Final edit - Professional publishing quality, consistent voice and tone, read-aloud pacing,
+   memorable phrases, strong opening and satisfying ending, character consistency.
+
+Then write an image generation prompt for the cover and for each page of the final version:
+vivid scene detail, "children's book illustration, warm colors, soft lighting",
+consistent character descriptions, composition (close-up, wide shot, etc.), no text in the image.
+
+Return ONLY the final version, as JSON:
+{{
+  "title": "Story Title",
+  "pages": [
+    {{"page": 1, "text": "Page text...", "emotion": "curiosity", "scene": "Brief scene description"}},
+    ...
+  ],
+  "cover_prompt": "Cover image prompt...",
+  "prompts": [
+    {{"page": 1, "prompt": "Detailed image prompt..."}},
+    ...
+  ]
+}}"""
+
+        response = self.llm.generate(prompt, max_tokens=8000)
+        return self._parse_json(response)
+    
     def _parse_json(self, response: str) -> dict:
         """Extract JSON from LLM response"""
-        import re
-        # Find JSON block
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
+        # Decode from the first '{'; stops at its closing brace, so trailing prose is ignored
+        idx = response.find("{")
+        if idx != -1:
             try:
-                return json.loads(json_match.group())
+                obj, _ = _DECODER.raw_decode(response, idx)
+                return obj
             except json.JSONDecodeError:
                 pass
         
@@ -163,17 +303,18 @@ Output as JSON:
         self.log(f"📚 Starting story: {config.topic}")
         self.log("=" * 50)
         
-        # Stage 1: Draft
-        draft = self.stage1_draft(config)
-        
-        # Stage 2: First Edit
-        edited = self.stage2_first_edit(draft)
-        
-        # Stage 3: Final Edit
-        final = self.stage3_final_edit(edited)
+        data = self.generate_combined(config)
         
-        # Generate image prompts
-        image_prompts = self.generate_image_prompts(final)
+        if "pages" in data and "prompts" in data:
+            final = {k: data[k] for k in ("title", "pages") if k in data}
+            image_prompts = {"cover_prompt": data.get("cover_prompt", ""), "pages": data["prompts"]}
+        else:
+            # Unparsable combined reply: fall back to one call per stage
+            self.log("⚠️ Combined reply incomplete, running stages separately...")
+            draft = self.stage1_draft(config)
+            edited = self.stage2_first_edit(draft)
+            final = self.stage3_final_edit(edited)
+            image_prompts = self.generate_image_prompts(final)
         
         self.log("=" * 50)
         self.log("✅ Story writing complete!")
@@ -228,7 +369,7 @@ def save_story_json(story: dict, prompts: dict, output_dir: Path):
         "image_prompts": prompts
     }
     json_path = output_dir / "story_data.json"
-    json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    json_path.write_bytes(dumps(data, indent=True))
     return json_path
 
 
@@ -0,0 +1,27 @@
+"""
+pytest 공통 설정
+
+src/ 를 sys.path에 추가하여 각 Lambda 핸들러를
+importlib.import_module("<함수명>.handler")로 로드합니다.
+한 번 로드된 핸들러는 sys.modules에 캐시되어 세션 동안 재사용됩니다.
+저장소 루트도 추가하여 kdp 패키지를 바로 import할 수 있습니다.
+
+boto3 · openai는 모든 테스트에서 모킹하므로 세션 시작 시 sys.modules에
+스텁을 넣어 실제 패키지 import 비용을 건너뜁니다.
+테스트별 동작은 각 파일에서 핸들러 속성을 덮어써서 지정합니다.
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+
+# src/ → Lambda 핸들러, 저장소 루트 → kdp 패키지
+for _path in (SRC_DIR, ROOT_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+for _name in ("boto3", "boto3.s3", "boto3.s3.transfer", "openai"):
+    sys.modules.setdefault(_name, MagicMock())
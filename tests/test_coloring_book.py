@@ -0,0 +1,76 @@
+"""
+Unit tests — coloring_book.py
+
+_JSONScanner: 스트리밍 델타가 임의 위치에서 잘려 들어와도 같은 객체가 나오는지 검증합니다.
+"""
+
+import json
+
+import pytest
+
+from coloring_book import ColoringBookConfig, ColoringBookGenerator, _JSONScanner, _find_json
+
+# 문자열 안의 중괄호 · 이스케이프된 따옴표 · 역슬래시를 모두 포함한 응답
+STREAMED = (
+    'Sure! Here are the "prompts":\n'
+    '{"pages": ['
+    '{"page": "cover", "prompt": "A \\"bold\\" {title} banner"}, '
+    '{"page": 1, "prompt": "Line art \\\\ with } and { braces", "tags": {"k": "v"}}, '
+    '{"page": 2, "prompt": "Ends with a backslash \\\\"}'
+    ']}\n'
+    'Let me know if you need more.'
+)
+
+EXPECTED_PAGES = [
+    {"page": "cover", "prompt": 'A "bold" {title} banner'},
+    {"page": 1, "prompt": "Line art \\ with } and { braces", "tags": {"k": "v"}},
+    {"page": 2, "prompt": "Ends with a backslash \\"},
+]
+
+
+def _feed_chunks(scanner: _JSONScanner, chunks) -> list[dict]:
+    return [json.loads(raw) for chunk in chunks for raw in scanner.feed(chunk)]
+
+
+class TestJSONScanner:
+    def test_depth2_yields_each_page_object(self):
+        assert _feed_chunks(_JSONScanner(depth=2), [STREAMED]) == EXPECTED_PAGES
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7])
+    def test_chunk_boundaries_do_not_matter(self, size):
+        chunks = [STREAMED[i:i + size] for i in range(0, len(STREAMED), size)]
+        assert _feed_chunks(_JSONScanner(depth=2), chunks) == EXPECTED_PAGES
+
+    def test_split_inside_escape_sequence(self):
+        # 역슬래시와 이스케이프된 따옴표 사이에서 잘린 경우
+        cut = STREAMED.index('\\"bold') + 1
+        chunks = [STREAMED[:cut], STREAMED[cut:]]
+        assert _feed_chunks(_JSONScanner(depth=2), chunks) == EXPECTED_PAGES
+
+    def test_depth1_returns_whole_object(self):
+        (raw,) = list(_JSONScanner().feed(STREAMED))
+        assert json.loads(raw)["pages"] == EXPECTED_PAGES
+
+    def test_find_json_ignores_prose_and_unbalanced_input(self):
+        assert json.loads(_find_json('prose {"a": "}"} trailing')) == {"a": "}"}
+        assert _find_json('{"a": 1') is None
+        assert _find_json("no json here") is None
+
+
+class TestGenerateCombined:
+    def test_unparsed_reply_is_not_memoized(self):
+        generator = ColoringBookGenerator("mock", progress_callback=lambda *_: None)
+        replies = iter([{"raw": "not json"}, {"title": "T", "pages": [], "cover_prompt": "", "prompts": []}])
+        calls = []
+
+        def fake_generate_json(*args, **kwargs):
+            calls.append(args)
+            return next(replies)
+
+        generator._generate_json = fake_generate_json
+        config = ColoringBookConfig(theme="cats")
+
+        assert generator.generate_combined(config) == {"raw": "not json"}
+        assert generator.generate_combined(config)["title"] == "T"    # 실패 결과는 재시도
+        assert generator.generate_combined(config)["title"] == "T"    # 성공 결과는 재사용
+        assert len(calls) == 2
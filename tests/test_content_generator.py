@@ -1,57 +1,64 @@
 """
 Unit tests — content_generator/handler.py
 
-모듈 이름이 모두 handler.py이므로 importlib.util을 사용하여
-각 테스트 파일마다 독립적으로 로드합니다.
+모듈 이름이 모두 handler.py이므로 "<함수명>.handler" 패키지 경로로
+import합니다 (src/ 경로는 conftest.py에서 추가).
 """
 
-import os
-import importlib.util
-from unittest.mock import MagicMock
+import importlib
+from types import SimpleNamespace
 
 import pytest
 
-_HANDLER_FILE = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "src", "content_generator", "handler.py")
-)
+
+@pytest.fixture(scope="module")
+def _handler_module():
+    """content_generator 핸들러를 테스트 파일당 한 번만 로드."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("S3_BUCKET",          "test-bucket")
+        mp.setenv("OPENAI_SECRET_ARN",  "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test")
+
+        mod = importlib.import_module("content_generator.handler")   # sys.modules에 캐시
+        yield mod
 
 
 @pytest.fixture()
-def handler(monkeypatch):
-    """content_generator 핸들러를 깨끗하게 로드."""
-    monkeypatch.setenv("S3_BUCKET",          "test-bucket")
-    monkeypatch.setenv("OPENAI_SECRET_ARN",  "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test")
-
-    spec = importlib.util.spec_from_file_location("_cg_handler", _HANDLER_FILE)
-    mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+def handler(_handler_module):
+    """웜 컨테이너 캐시를 비운 핸들러."""
+    mod = _handler_module
     mod._api_key_cache = None   # 캐시 초기화
+    mod._s3_client     = None
+    mod._sm_client     = None
     return mod
 
 
-def _setup_mocks(handler, monkeypatch, api_reply: str):
-    """boto3 + OpenAI 공통 모킹."""
-    sm = MagicMock()
+def _setup_mocks(handler, mocker, api_reply: str):
+    """boto3 + OpenAI 공통 모킹 (autospec 끔 — 실제 모듈 시그니처를 들여다보지 않음)."""
+    sm = mocker.MagicMock()
     sm.get_secret_value.return_value = {"SecretString": "sk-test-key"}
-    s3 = MagicMock()
+    s3 = mocker.MagicMock()
 
-    mock_boto3 = MagicMock()
+    mock_boto3 = mocker.patch.object(handler, "boto3", autospec=False)
     mock_boto3.client = lambda svc, **kw: sm if svc == "secretsmanager" else s3
-    monkeypatch.setattr(handler, "boto3", mock_boto3)
 
-    resp = MagicMock()
-    resp.choices = [MagicMock()]
-    resp.choices[0].message.content = api_reply
-    client = MagicMock()
-    client.chat.completions.create.return_value = resp
-    monkeypatch.setattr(handler, "OpenAI", MagicMock(return_value=client))
+    client = mocker.MagicMock()
+    client.chat.completions.create.side_effect = lambda **kw: _stream(api_reply)
+    mocker.patch.object(handler, "OpenAI", autospec=False, return_value=client)
 
     return s3, client
 
 
+def _stream(text: str) -> list:
+    """stream=True 응답 모킹 — 두 조각으로 나눈 delta 청크."""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+        for part in (text[:len(text) // 2], text[len(text) // 2:])
+    ]
+
+
 class TestContentGenerator:
-    def test_returns_s3_key_and_word_count(self, handler, monkeypatch):
-        s3, _ = _setup_mocks(handler, monkeypatch, "챕터 본문입니다. 여러 단어가 포함되어 있습니다.")
+    def test_returns_s3_key_and_word_count(self, handler, mocker):
+        s3, _ = _setup_mocks(handler, mocker, "챕터 본문입니다. 여러 단어가 포함되어 있습니다.")
 
         result = handler.lambda_handler({
             "book_id":  "book-test-01",
@@ -65,8 +72,8 @@ class TestContentGenerator:
         assert result["word_count"] > 0
         s3.put_object.assert_called_once()
 
-    def test_generates_outline_when_empty(self, handler, monkeypatch):
-        _, client = _setup_mocks(handler, monkeypatch, "1. 챕터 하나\n2. 챕터 둘\n3. 챕터 셋")
+    def test_generates_outline_when_empty(self, handler, mocker):
+        _, client = _setup_mocks(handler, mocker, "1. 챕터 하나\n2. 챕터 둘\n3. 챕터 셋")
 
         handler.lambda_handler({
             "book_id":  "book-test-02",
@@ -79,6 +86,34 @@ class TestContentGenerator:
         # outline 생성 1회 + 챕터 3개 생성 = 최소 4회 호출
         assert client.chat.completions.create.call_count >= 4
 
+    def test_chapters_assembled_in_order(self, handler, mocker):
+        # 동시 생성이어도 챕터 순서대로 조립
+        def reply(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            return _stream(prompt.split("현재 챕터: ")[1].split("\n")[0])
+
+        client = mocker.MagicMock()
+        client.chat.completions.create.side_effect = reply
+
+        content = handler._generate_full_book(client, "책", "주제", ["가", "나", "다", "라"], "ko")
+
+        positions = [content.index(f"## Chapter {i}:") for i in range(1, 5)]
+        assert positions == sorted(positions)
+        assert "Chapter 3 — 다" in content
+
+    def test_openai_key_refreshed_after_ttl(self, handler, mocker):
+        sm = mocker.patch.object(handler, "_sm_client", autospec=False)
+        sm.get_secret_value.side_effect = [{"SecretString": "sk-old"}, {"SecretString": "sk-new"}]
+        mocker.patch.object(
+            handler.time, "monotonic", autospec=False,
+            side_effect=[100.0, 200.0, 100.0 + handler.SECRET_TTL],
+        )
+
+        assert handler._get_openai_key() == "sk-old"
+        assert handler._get_openai_key() == "sk-old"    # TTL 내 — 재조회 없음
+        assert handler._get_openai_key() == "sk-new"    # 만료 → 로테이션 반영
+        assert sm.get_secret_value.call_count == 2
+
     def test_parse_chapters_extracts_correctly(self, handler):
         chapters = handler._parse_chapters("1. 첫 챕터\n2. 두번째\n\n3. 세번째\n")
         assert len(chapters) == 3
@@ -86,3 +121,56 @@ class TestContentGenerator:
 
     def test_parse_chapters_fallback(self, handler):
         assert handler._parse_chapters("") == ["개론", "본론", "결론"]
+
+    def test_batch_mode_submits_jsonl(self, handler, mocker):
+        _, client = _setup_mocks(handler, mocker, "")
+        mocker.patch.object(handler, "USE_BATCH_API", True)
+        client.batches.create.return_value.id = "batch_123"
+
+        result = handler.lambda_handler({
+            "book_id":  "book-test-03",
+            "title":    "배치 책",
+            "topic":    "주제",
+            "outline":  "1. 하나\n2. 둘",
+        }, None)
+
+        assert result == {"batch_id": "batch_123", "chapters": ["하나", "둘"]}
+        client.chat.completions.create.assert_not_called()
+        _, jsonl = client.files.create.call_args.kwargs["file"]
+        lines = jsonl.decode("utf-8").splitlines()
+        assert [handler.json.loads(l)["custom_id"] for l in lines] == ["chapter-1", "chapter-2"]
+
+    def test_poll_assembles_completed_batch(self, handler, mocker):
+        s3, client = _setup_mocks(handler, mocker, "")
+        client.batches.retrieve.return_value.status = "completed"
+        # 결과 JSONL 순서는 보장되지 않음
+        client.files.content.return_value.text = "\n".join(
+            handler.json.dumps({
+                "custom_id": f"chapter-{idx}",
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": body}}]}},
+            })
+            for idx, body in [(2, "둘째 본문"), (1, "첫째 본문")]
+        )
+
+        result = handler.poll_handler({
+            "book_id":  "book-test-04",
+            "title":    "배치 책",
+            "batch_id": "batch_123",
+            "chapters": ["하나", "둘"],
+        }, None)
+
+        assert result["status"] == "completed"
+        assert result["content_s3_key"] == "book-test-04/content/manuscript.md"
+        body = s3.put_object.call_args.kwargs["Body"].decode("utf-8")
+        assert body.index("첫째 본문") < body.index("둘째 본문")
+
+    def test_poll_returns_status_while_running(self, handler, mocker):
+        s3, client = _setup_mocks(handler, mocker, "")
+        client.batches.retrieve.return_value.status = "in_progress"
+
+        result = handler.poll_handler({
+            "book_id": "b", "title": "t", "batch_id": "batch_123", "chapters": ["하나"],
+        }, None)
+
+        assert result == {"status": "in_progress"}
+        s3.put_object.assert_not_called()
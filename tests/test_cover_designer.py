@@ -2,55 +2,97 @@
 Unit tests — cover_designer/handler.py
 """
 
-import os
-import importlib.util
+import io
+import sys
+import importlib
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
 
-_HANDLER_FILE = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "src", "cover_designer", "handler.py")
+# import만 통과하면 되는 무거운 의존성 — 테스트에서 전부 모킹하므로 실제 로드 생략 (boto3 · openai는 conftest.py)
+_STUB_MODULES = (
+    "requests", "requests.adapters", "urllib3", "urllib3.util", "urllib3.util.retry",
 )
 
 
-@pytest.fixture()
-def handler(monkeypatch):
-    monkeypatch.setenv("S3_BUCKET",         "test-bucket")
-    monkeypatch.setenv("OPENAI_SECRET_ARN", "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test")
+@pytest.fixture(scope="module")
+def _handler_module():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("S3_BUCKET",         "test-bucket")
+        mp.setenv("OPENAI_SECRET_ARN", "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test")
+
+        for name in _STUB_MODULES:
+            if name not in sys.modules:
+                mp.setitem(sys.modules, name, MagicMock())
+
+        mod = importlib.import_module("cover_designer.handler")   # sys.modules에 캐시
+        yield mod
+
 
-    spec = importlib.util.spec_from_file_location("_cd_handler", _HANDLER_FILE)
-    mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+@pytest.fixture()
+def handler(_handler_module):
+    mod = _handler_module
     mod._api_key_cache = None
+    mod._s3_client     = None
+    mod._sm_client     = None
+    mod._http_session  = None
     return mod
 
 
-def _setup_mocks(handler, monkeypatch):
-    """boto3 · OpenAI · requests 공통 모킹."""
-    sm = MagicMock()
-    sm.get_secret_value.return_value = {"SecretString": "sk-test"}
-    s3 = MagicMock()
+class _RecordingS3:
+    """upload_fileobj 호출만 기록하는 가벼운 S3 대역 (MagicMock보다 생성·접근 비용이 작음)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, **kw):
+        self.calls.append((Fileobj, Bucket, Key))
 
-    mock_boto3 = MagicMock()
-    mock_boto3.client = lambda svc, **kw: sm if svc == "secretsmanager" else s3
-    monkeypatch.setattr(handler, "boto3", mock_boto3)
+
+def _image_response():
+    """stream=True 이미지 다운로드 응답 (with 블록 지원)."""
+    img_http = MagicMock(raw=io.BytesIO(b"\x89PNG-fake-bytes"))
+    img_http.__enter__.return_value = img_http
+    return img_http
+
+
+@pytest.fixture(scope="class")
+def _class_mocks(_handler_module):
+    """boto3 · OpenAI · requests 공통 모킹 — 클래스당 한 번 생성."""
+    sm = SimpleNamespace(get_secret_value=lambda **kw: {"SecretString": "sk-test"})
+    s3 = _RecordingS3()
 
     img_resp = MagicMock()
     img_resp.data = [MagicMock(url="https://example.com/img.png")]
     client = MagicMock()
     client.images.generate.return_value = img_resp
-    monkeypatch.setattr(handler, "OpenAI", MagicMock(return_value=client))
 
     mock_requests = MagicMock()
-    mock_requests.get.return_value = MagicMock(content=b"\x89PNG-fake-bytes")
-    monkeypatch.setattr(handler, "requests", mock_requests)
+    mock_requests.Session.return_value.get.side_effect = lambda *a, **kw: _image_response()
 
+    with pytest.MonkeyPatch.context() as mp:
+        # 캐시된 클라이언트는 handler 픽스처가 매번 비우므로 boto3.client가 대역을 돌려주게 함
+        mp.setattr(_handler_module, "boto3", SimpleNamespace(
+            client=lambda svc, **kw: sm if svc == "secretsmanager" else s3,
+        ))
+        mp.setattr(_handler_module, "OpenAI", MagicMock(return_value=client))
+        mp.setattr(_handler_module, "requests", mock_requests)
+        yield client, s3
+
+
+@pytest.fixture()
+def mocks(_class_mocks):
+    """클래스 공용 모킹에서 이전 테스트의 호출 기록을 지운 (client, s3)."""
+    client, s3 = _class_mocks
+    client.reset_mock()
+    s3.calls.clear()
     return client, s3
 
 
 class TestCoverDesigner:
-    def test_returns_cover_s3_key(self, handler, monkeypatch):
-        client, s3 = _setup_mocks(handler, monkeypatch)
+    def test_returns_cover_s3_key(self, handler, mocks):
+        client, s3 = mocks
 
         result = handler.lambda_handler({
             "book_id": "book-cover-01",
@@ -61,10 +103,13 @@ class TestCoverDesigner:
 
         assert result["cover_s3_key"] == "book-cover-01/cover/cover.png"
         client.images.generate.assert_called_once()
-        s3.put_object.assert_called_once()
+        assert len(s3.calls) == 1
+        fileobj, _, key = s3.calls[0]
+        assert key == "book-cover-01/cover/cover.png"
+        assert fileobj.read() == b"\x89PNG-fake-bytes"
 
-    def test_dall_e_params(self, handler, monkeypatch):
-        client, _ = _setup_mocks(handler, monkeypatch)
+    def test_dall_e_params(self, handler, mocks):
+        client, _ = mocks
 
         handler.lambda_handler({"book_id": "x", "title": "T", "genre": "fiction", "style": "s"}, None)
 
@@ -0,0 +1,36 @@
+"""
+Unit tests — kdp/jsonio.py
+
+orjson 경로와 표준 json 경로가 동등한 JSON을 만드는지 검증합니다.
+(실수 표기가 달라 바이트 단위 비교는 하지 않음)
+"""
+
+import pytest
+
+from kdp import jsonio
+
+SAMPLE = {"title": "테스트 책", 1: "정수 키", "nested": {2: [1, 2.5, 1e-6, None, True]}}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(jsonio, "orjson", None)
+    elif jsonio.orjson is None:
+        pytest.skip("orjson 미설치")
+    return request.param
+
+
+class TestJsonIO:
+    def test_non_str_keys_become_strings(self, backend):
+        assert jsonio.loads(jsonio.dumps(SAMPLE)) == {
+            "title": "테스트 책", "1": "정수 키", "nested": {"2": [1, 2.5, 1e-6, None, True]},
+        }
+
+    @pytest.mark.parametrize("indent", [False, True])
+    def test_both_paths_produce_equivalent_json(self, monkeypatch, indent):
+        if jsonio.orjson is None:
+            pytest.skip("orjson 미설치")
+        fast = jsonio.dumps(SAMPLE, indent=indent)
+        monkeypatch.setattr(jsonio, "orjson", None)
+        assert jsonio.loads(jsonio.dumps(SAMPLE, indent=indent)) == jsonio.loads(fast)
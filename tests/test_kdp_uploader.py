@@ -4,15 +4,11 @@ Unit tests — kdp_uploader/handler.py
 
 import json
 import os
-import importlib.util
+import importlib
 from unittest.mock import MagicMock
 
 import pytest
 
-_HANDLER_FILE = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "src", "kdp_uploader", "handler.py")
-)
-
 SAMPLE_EVENT = {
     "book_id":          "up-01",
     "title":            "업로드 테스트 책",
@@ -26,22 +22,44 @@ SAMPLE_EVENT = {
 }
 
 
-def _load_handler(monkeypatch, upload_mode: str = "MANIFEST_ONLY"):
-    """환경 변수를 세팅한 후 핸들러를 로드."""
-    monkeypatch.setenv("S3_BUCKET",      "test-bucket")
-    monkeypatch.setenv("UPLOAD_MODE",    upload_mode)
-    monkeypatch.setenv("KDP_SECRET_ARN", "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test")
+# 핸들러가 import 시점에 읽는 환경 변수
+_ENV = {
+    "S3_BUCKET":      "test-bucket",
+    "UPLOAD_MODE":    "MANIFEST_ONLY",
+    "KDP_SECRET_ARN": "arn:aws:secretsmanager:ap-northeast-2:123456789012:secret:test",
+}
+
 
-    spec = importlib.util.spec_from_file_location("_ku_handler", _HANDLER_FILE)
-    mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+@pytest.fixture(scope="module")
+def _handler_module():
+    """kdp_uploader 핸들러를 테스트 파일당 한 번만 로드 (MANIFEST_ONLY 모드)."""
+    saved = {name: os.environ.get(name) for name in _ENV}
+    os.environ.update(_ENV)                            # 한 번에 세팅
+    try:
+        yield importlib.import_module("kdp_uploader.handler")   # sys.modules에 캐시 (boto3는 conftest 스텁)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@pytest.fixture()
+def handler(_handler_module):
+    mod = _handler_module
+    mod._s3_client = None
     return mod
 
 
-def _mock_s3(handler, monkeypatch, head_ok: bool = True):
+def _mock_s3(handler, monkeypatch, listed=(SAMPLE_EVENT["pdf_s3_key"], SAMPLE_EVENT["cover_pdf_s3_key"]),
+             truncated: bool = False):
+    """list_objects_v2가 listed 키만 돌려주는 S3 모킹 (truncated면 목록이 잘린 것으로 응답)."""
     s3 = MagicMock()
-    if not head_ok:
-        s3.head_object.side_effect = Exception("404 Not Found")
+    s3.list_objects_v2.return_value = {
+        "Contents":    [{"Key": key} for key in listed],
+        "IsTruncated": truncated,
+    }
 
     mock_boto3 = MagicMock()
     mock_boto3.client.return_value = s3
@@ -50,15 +68,15 @@ def _mock_s3(handler, monkeypatch, head_ok: bool = True):
 
 
 class TestKdpUploader:
-    def test_manifest_created_successfully(self, monkeypatch):
-        handler = _load_handler(monkeypatch, "MANIFEST_ONLY")
-        s3      = _mock_s3(handler, monkeypatch)
+    def test_manifest_created_successfully(self, handler, monkeypatch):
+        s3 = _mock_s3(handler, monkeypatch)
 
         result = handler.lambda_handler(SAMPLE_EVENT, None)
 
         assert result["status"]          == "READY_FOR_UPLOAD"
         assert result["asin"]            == "PENDING"
         assert result["manifest_s3_key"] == "up-01/output/manifest.json"
+        s3.list_objects_v2.assert_called_once_with(Bucket="test-bucket", Prefix="up-01/output/")
 
         # put_object 호출 내용으로 매니페스트 검증
         put_kw   = s3.put_object.call_args[1]
@@ -67,15 +85,31 @@ class TestKdpUploader:
         assert manifest["files"]["interior_pdf"]  == "up-01/output/interior.pdf"
         assert manifest["metadata"]["price_usd"]  == "19.99"
 
-    def test_raises_when_s3_object_missing(self, monkeypatch):
-        handler = _load_handler(monkeypatch, "MANIFEST_ONLY")
-        _mock_s3(handler, monkeypatch, head_ok=False)
+    def test_raises_when_s3_object_missing(self, handler, monkeypatch):
+        s3 = _mock_s3(handler, monkeypatch, listed=())
 
         with pytest.raises(ValueError, match="S3 객체를 찾을 수 없습니다"):
             handler.lambda_handler(SAMPLE_EVENT, None)
+        s3.head_object.assert_not_called()          # 완전한 목록이면 개별 확인 없이 실패
+
+    def test_truncated_listing_falls_back_to_head_object(self, handler, monkeypatch):
+        s3 = _mock_s3(handler, monkeypatch, listed=[SAMPLE_EVENT["pdf_s3_key"]], truncated=True)
+
+        result = handler.lambda_handler(SAMPLE_EVENT, None)
+
+        assert result["status"] == "READY_FOR_UPLOAD"
+        s3.head_object.assert_called_once_with(Bucket="test-bucket", Key=SAMPLE_EVENT["cover_pdf_s3_key"])
+
+    def test_truncated_listing_raises_when_head_object_fails(self, handler, monkeypatch):
+        s3 = _mock_s3(handler, monkeypatch, listed=[SAMPLE_EVENT["pdf_s3_key"]], truncated=True)
+        s3.head_object.side_effect = Exception("404 Not Found")
+
+        with pytest.raises(ValueError, match="cover.pdf"):
+            handler.lambda_handler(SAMPLE_EVENT, None)
+        s3.put_object.assert_not_called()
 
-    def test_sp_api_mode_raises_not_implemented(self, monkeypatch):
-        handler = _load_handler(monkeypatch, "SP_API")    # SP_API 모드로 로드
+    def test_sp_api_mode_raises_not_implemented(self, handler, monkeypatch):
+        monkeypatch.setattr(handler, "UPLOAD_MODE", "SP_API")    # 호출 시점에 모드 참조 — 재로드 불필요
         _mock_s3(handler, monkeypatch)
 
         with pytest.raises(NotImplementedError):
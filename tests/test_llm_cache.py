@@ -0,0 +1,95 @@
+"""
+Unit tests — kdp/backends/llm_base.py CachedLLMBackend
+
+ClaudeBackend에 가짜 messages 클라이언트를 주입하여 캐시 동작만 검증합니다.
+(anthropic 패키지는 client 프로퍼티에서만 import되므로 필요 없음)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from kdp.backends import llm_base
+from kdp.backends.claude import ClaudeBackend
+
+
+class _FakeMessages:
+    """messages.create 호출 수를 세고 고정 응답을 돌려주는 대역."""
+
+    def __init__(self, text: str = "응답", stop_reason: str = "end_turn"):
+        self.text = text
+        self.stop_reason = stop_reason
+        self.calls = 0
+
+    def create(self, **params):
+        self.calls += 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=f"{self.text}-{self.calls}")],
+            stop_reason=self.stop_reason,
+            usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+        )
+
+
+def _backend(monkeypatch, tmp_path, cache: str | None = "1", **reply) -> tuple[ClaudeBackend, _FakeMessages]:
+    if cache is None:
+        monkeypatch.delenv("LLM_CACHE", raising=False)
+    else:
+        monkeypatch.setenv("LLM_CACHE", cache)
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("LLM_SEMANTIC_CACHE", raising=False)
+
+    backend  = ClaudeBackend(api_key="sk-test")
+    messages = _FakeMessages(**reply)
+    backend._client = SimpleNamespace(messages=messages)
+    return backend, messages
+
+
+class TestLLMCache:
+    def test_hit_skips_api_call(self, monkeypatch, tmp_path):
+        backend, messages = _backend(monkeypatch, tmp_path)
+
+        first  = backend.generate("프롬프트", "시스템", max_tokens=100)
+        second = backend.generate("프롬프트", "시스템", max_tokens=100)
+
+        assert first == second == "응답-1"
+        assert messages.calls == 1
+        assert backend.token_usage.output_tokens == 5     # 캐시 적중은 사용량에 포함되지 않음
+
+    def test_max_tokens_is_part_of_key(self, monkeypatch, tmp_path):
+        backend, messages = _backend(monkeypatch, tmp_path)
+
+        backend.generate("프롬프트", max_tokens=100)
+        assert backend.generate("프롬프트", max_tokens=4000) == "응답-2"
+        assert messages.calls == 2
+
+    def test_truncated_reply_not_cached(self, monkeypatch, tmp_path):
+        backend, messages = _backend(monkeypatch, tmp_path, stop_reason="max_tokens")
+
+        backend.generate("프롬프트", max_tokens=10)
+        backend.generate("프롬프트", max_tokens=10)
+
+        assert messages.calls == 2
+        assert list(tmp_path.iterdir()) == []
+
+    def test_expired_entry_is_refetched(self, monkeypatch, tmp_path):
+        backend, messages = _backend(monkeypatch, tmp_path)
+        backend.cache_ttl = 60
+
+        now = 1_000_000.0
+        monkeypatch.setattr(llm_base.time, "time", lambda: now)
+        backend.generate("프롬프트", max_tokens=100)
+
+        now += 61                                         # TTL 경과
+        assert backend.generate("프롬프트", max_tokens=100) == "응답-2"
+        assert messages.calls == 2
+
+    @pytest.mark.parametrize("cache", ["0", None])        # LLM_CACHE=0 / 미설정(기본 비활성)
+    def test_disabled_cache_always_calls_api(self, monkeypatch, tmp_path, cache):
+        backend, messages = _backend(monkeypatch, tmp_path, cache=cache)
+
+        backend.generate("프롬프트", max_tokens=100)
+        backend.generate("프롬프트", max_tokens=100)
+
+        assert not backend.cache_enabled
+        assert messages.calls == 2
+        assert list(tmp_path.iterdir()) == []
@@ -2,17 +2,11 @@
 Unit tests — pdf_assembler/handler.py
 """
 
-import io
-import os
-import importlib.util
+import importlib
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
-from PIL import Image
-
-_HANDLER_FILE = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "src", "pdf_assembler", "handler.py")
-)
 
 SAMPLE_MD = """\
 # Assembly Test Book
@@ -33,25 +27,47 @@ Moving into the main body now.
 This is the closing chapter of the test book.
 """
 
+SAMPLE_MD_BYTES = SAMPLE_MD.encode("utf-8")
 
-def _make_png_bytes() -> bytes:
-    """유효한 100×100 테스트 PNG 생성."""
-    buf = io.BytesIO()
-    Image.new("RGB", (100, 100), color=(80, 120, 200)).save(buf, format="PNG")
-    return buf.getvalue()
 
+# 1×1 RGB 테스트 PNG (표지는 고정 크기로 늘려 그리므로 해상도 무관)
+TEST_PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    b"\x00\x00\x00\x0dIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90\x77\x53\xde"
+    b"\x00\x00\x00\x0cIDAT\x78\xda\x63\x08\xa8\x38\x01\x00\x02\xac\x01\x91\xc9\x02\x86\xe4"
+    b"\x00\x00\x00\x00IEND\xae\x42\x60\x82"
+)
 
-TEST_PNG = _make_png_bytes()
+# 공용 이벤트 (핸들러는 읽기만 함 — 바꿀 값은 {**SAMPLE_EVENT, ...}로 덮어씀)
+SAMPLE_EVENT = {
+    "book_id":        "asm-01",
+    "title":          "PDF Assembly Test",
+    "author":         "Test Author",
+    "content_s3_key": "asm-01/content/manuscript.md",
+    "cover_s3_key":   "asm-01/cover/cover.png",
+}
 
 
-@pytest.fixture()
-def handler(monkeypatch):
-    monkeypatch.setenv("S3_BUCKET", "test-bucket")
+# get_object 응답 — 키별로 미리 만들어 두고 조회만 함 (read는 호출마다 새로 읽음)
+_OBJECTS = {
+    SAMPLE_EVENT["content_s3_key"]: {"Body": SimpleNamespace(read=lambda: SAMPLE_MD_BYTES)},
+    SAMPLE_EVENT["cover_s3_key"]:   {"Body": SimpleNamespace(read=lambda: TEST_PNG)},
+}
+
 
-    spec = importlib.util.spec_from_file_location("_pa_handler", _HANDLER_FILE)
-    mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod
+@pytest.fixture(scope="module")
+def _handler_module():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("S3_BUCKET", "test-bucket")
+
+        mod = importlib.import_module("pdf_assembler.handler")   # sys.modules에 캐시
+        yield mod
+
+
+@pytest.fixture()
+def handler(_handler_module):
+    _handler_module._s3_client = None
+    return _handler_module
 
 
 def _setup_mocks(handler, monkeypatch):
@@ -59,11 +75,7 @@ def _setup_mocks(handler, monkeypatch):
     monkeypatch.setattr(handler, "_ensure_font", lambda: False)   # Korean font 건너뜀
 
     s3 = MagicMock()
-    s3.get_object.side_effect = lambda Bucket, Key: {
-        "Body": MagicMock(read=lambda: SAMPLE_MD.encode("utf-8"))
-    } if "content" in Key else {
-        "Body": MagicMock(read=lambda: TEST_PNG)
-    }
+    s3.get_object.side_effect = lambda Bucket, Key: _OBJECTS[Key]
 
     mock_boto3 = MagicMock()
     mock_boto3.client.return_value = s3
@@ -75,29 +87,19 @@ class TestPdfAssembler:
     def test_produces_two_pdfs(self, handler, monkeypatch):
         s3 = _setup_mocks(handler, monkeypatch)
 
-        result = handler.lambda_handler({
-            "book_id":        "asm-01",
-            "title":          "PDF Assembly Test",
-            "author":         "Test Author",
-            "content_s3_key": "asm-01/content/manuscript.md",
-            "cover_s3_key":   "asm-01/cover/cover.png",
-        }, None)
+        result = handler.lambda_handler(SAMPLE_EVENT, None)
 
         assert result["pdf_s3_key"]       == "asm-01/output/interior.pdf"
         assert result["cover_pdf_s3_key"] == "asm-01/output/cover.pdf"
         assert result["interior_pages"]   >= 2      # 타이틀 + 챕터 최소 2
-        assert s3.put_object.call_count   == 2
+        assert s3.upload_fileobj.call_count == 2
+        pdf_body = s3.upload_fileobj.call_args_list[0][0][0].getvalue()
+        assert pdf_body.startswith(b"%PDF")
 
     def test_interior_pages_count(self, handler, monkeypatch):
         _setup_mocks(handler, monkeypatch)
 
-        result = handler.lambda_handler({
-            "book_id":        "asm-02",
-            "title":          "Page Count Test",
-            "author":         "Author",
-            "content_s3_key": "asm-02/content/manuscript.md",
-            "cover_s3_key":   "asm-02/cover/cover.png",
-        }, None)
+        result = handler.lambda_handler({**SAMPLE_EVENT, "book_id": "asm-02", "title": "Page Count Test"}, None)
 
         # 타이틀 1 + 챕터 2 = 최소 3 페이지
         assert result["interior_pages"] >= 3
@@ -0,0 +1,57 @@
+"""
+Unit tests — kdp/pdf_reportlab.py (PDF_ENGINE=reportlab)
+
+reportlab이 설치되지 않은 환경에서는 건너뜁니다.
+"""
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from kdp.config import BookConfig
+from kdp.pipeline import Pipeline
+
+SAMPLE_MD = """\
+# ReportLab Test Book
+
+## Chapter 1: Introduction
+
+### Background
+Plain paragraph with <angle> & ampersand characters.
+Second line of the same paragraph.
+
+- Point one
+- Point two
+
+## Chapter 2: Conclusion
+
+Closing words.
+"""
+
+# 1×1 RGB PNG (표지는 고정 크기로 늘려 그림)
+TEST_PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    b"\x00\x00\x00\x0dIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90\x77\x53\xde"
+    b"\x00\x00\x00\x0cIDAT\x78\xda\x63\x08\xa8\x38\x01\x00\x02\xac\x01\x91\xc9\x02\x86\xe4"
+    b"\x00\x00\x00\x00IEND\xae\x42\x60\x82"
+)
+
+
+class TestReportlabEngine:
+    def test_pipeline_builds_interior_with_reportlab(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PDF_ENGINE", "reportlab")
+        cover_path = tmp_path / "cover.png"
+        cover_path.write_bytes(TEST_PNG)
+
+        pipeline = Pipeline("unused.yaml", progress_callback=lambda *_: None, mock_mode=True)
+        pipeline.config = BookConfig(id="rl-01", title="ReportLab Test Book", author="Tester", topic="t")
+        pipeline.output_dir = tmp_path
+
+        pipeline._assemble_pdf(SAMPLE_MD, cover_path)
+
+        interior = (tmp_path / "interior.pdf").read_bytes()
+        assert interior.startswith(b"%PDF")
+        assert b"ReportLab" in interior                  # fpdf2가 아닌 reportlab 엔진으로 조판
+        assert interior.count(b"/Type /Page\n") >= 3     # 타이틀 + 챕터 2
+        assert (tmp_path / "cover.pdf").read_bytes().startswith(b"%PDF")
+        assert pipeline.status.pdf_assembled